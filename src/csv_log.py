@@ -1,5 +1,6 @@
 import csv
 import os
+from operator import itemgetter
 from datetime import datetime, timezone
 
 CSV_HEADERS = [
@@ -43,6 +44,26 @@ CSV_SCHEMA_DOC = {
     "details": "JSON string with probe-specific details (bytes, redirects, latencies, etc.)",
 }
 
+# Rows from make_row always carry every header key, so values can be pulled
+# out positionally instead of going through DictWriter's per-row dict lookups.
+_row_values = itemgetter(*CSV_HEADERS)
+
+# Write buffer for appends: a whole baseline/wifi-diag batch usually fits, so
+# it reaches the file in one write() on close.
+WRITE_BUFFER_BYTES = 64 * 1024
+
+# Paths whose parent dir exists and whose header has already been verified in
+# this process. Lets repeated appends (baseline loop) skip makedirs + header read.
+_csv_ready: set[str] = set()
+
+
+def reset_csv_cache():
+    """
+    Forget which CSV paths were already verified (e.g. after logrotate moved them).
+    The next append to each path re-checks the directory and header.
+    """
+    _csv_ready.clear()
+
 
 def utc_now_iso():
     return datetime.now(timezone.utc).isoformat()
@@ -65,45 +86,65 @@ def make_row(
     error_kind="",
     error_message="",
     details="",
+    timestamp=None,
 ):
-    row = {k: "" for k in CSV_HEADERS}
-    row["timestamp"] = utc_now_iso()
-    row["mode"] = mode
-    row["round_id"] = round_id
-    row["service_name"] = service_name
-    row["hostname"] = hostname or ""
-    row["url"] = url or ""
-    row["tags"] = tags or ""
-    row["probe_type"] = probe_type
-    row["success"] = str(bool(success)) if success != "" else ""
-    row["latency_ms"] = latency_ms if latency_ms is not None else ""
-    row["latency_p95_ms"] = latency_p95_ms if latency_p95_ms is not None else ""
-    row["jitter_ms"] = jitter_ms if jitter_ms is not None else ""
-    row["packet_loss_pct"] = packet_loss_pct if packet_loss_pct is not None else ""
-    row["status_code"] = status_code if status_code is not None else ""
-    row["error_kind"] = error_kind or ""
-    row["error_message"] = error_message or ""
-    row["details"] = details or ""
-    return row
+    """
+    Build a row dict keyed by CSV_HEADERS. timestamp defaults to now; callers
+    writing several rows for the same instant can pass one value for all of them.
+    """
+    # built in one literal (same key order as CSV_HEADERS) rather than
+    # pre-filling a blank dict and overwriting every key
+    return {
+        "timestamp": timestamp or utc_now_iso(),
+        "mode": mode,
+        "round_id": round_id,
+        "service_name": service_name,
+        "hostname": hostname or "",
+        "url": url or "",
+        "tags": tags or "",
+        "probe_type": probe_type,
+        "success": str(bool(success)) if success != "" else "",
+        "latency_ms": latency_ms if latency_ms is not None else "",
+        "latency_p95_ms": latency_p95_ms if latency_p95_ms is not None else "",
+        "jitter_ms": jitter_ms if jitter_ms is not None else "",
+        "packet_loss_pct": packet_loss_pct if packet_loss_pct is not None else "",
+        "status_code": status_code if status_code is not None else "",
+        "error_kind": error_kind or "",
+        "error_message": error_message or "",
+        "details": details or "",
+    }
 
 
 def append_rows(csv_path, rows):
     """
     Append rows to csv_path using CSV_HEADERS as the canonical schema.
+    Rows must be built with make_row (every header key present).
 
     If csv exists, the code checks the existing header matches CSV_HEADERS.
     If headers differ, a ValueError is raised with instructions to rotate/rename
     the existing file to avoid mixing incompatible schemas.
+
+    The directory/header check runs once per path per process; later calls just
+    append, writing the header again only if the file is new or empty (e.g. it
+    was rotated or deleted since). See reset_csv_cache.
     """
     if not rows:
         return
 
+    if csv_path in _csv_ready:
+        with open(csv_path, "a", buffering=WRITE_BUFFER_BYTES, newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(CSV_HEADERS)
+            writer.writerows(map(_row_values, rows))
+        return
+
     parent = os.path.dirname(csv_path)
     if parent:
         os.makedirs(parent, exist_ok=True)
 
     # open in a+ so we can read existing header and then append
-    with open(csv_path, "a+", newline="", encoding="utf-8") as f:
+    with open(csv_path, "a+", buffering=WRITE_BUFFER_BYTES, newline="", encoding="utf-8") as f:
         f.seek(0)
         reader = csv.reader(f)
         try:
@@ -123,8 +164,9 @@ def append_rows(csv_path, rows):
                 )
 
         f.seek(0, os.SEEK_END)
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+        writer = csv.writer(f)
         if not existing_headers:
-            writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+            writer.writerow(CSV_HEADERS)
+        writer.writerows(map(_row_values, rows))
+
+    _csv_ready.add(csv_path)
@@ -0,0 +1,60 @@
+"""
+Process-local cache of hostname -> IPv4 lookups, shared by the probes.
+
+Used to resolve a service's hostname once and hand the address to ping, so
+every ping call does not pay for its own resolver round trip.
+"""
+import socket
+import threading
+import time
+
+DEFAULT_TTL_S = 900
+# getaddrinfo has no timeout of its own; stop waiting after this and let the
+# caller fall back to the bare hostname
+RESOLVE_TIMEOUT_S = 2.0
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _lookup(host, out):
+    try:
+        out["infos"] = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        pass
+
+
+def resolve(host, ttl=DEFAULT_TTL_S, timeout=RESOLVE_TIMEOUT_S):
+    """
+    Return a cached IPv4 address for host, or None if it can't be resolved
+    within timeout seconds.
+    """
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(host)
+    if hit is not None and hit[1] > now:
+        return hit[0]
+
+    # same approach as dns_check.run_dns: a stalled resolver must not hold up
+    # the probe, so the lookup runs on a daemon thread and is abandoned on timeout
+    out = {}
+    worker = threading.Thread(target=_lookup, args=(host, out), name="netinsight-resolve", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    infos = out.get("infos")
+    if not infos:
+        return None
+
+    ip = infos[0][4][0]
+    with _lock:
+        _cache[host] = (ip, now + ttl)
+    return ip
+
+
+def invalidate(host=None):
+    """Drop one cached host (or everything) so the next resolve() asks the resolver again."""
+    with _lock:
+        if host is None:
+            _cache.clear()
+        else:
+            _cache.pop(host, None)
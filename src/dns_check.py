@@ -2,24 +2,40 @@
 Simple DNS probe using socket.gethostbyname and a short timeout.
 """
 import socket
+import threading
 import time
 
 from .error_kinds import DNS_OK, DNS_GAIERROR, DNS_TIMEOUT, DNS_EXCEPTION
 
 
+def _lookup(hostname, out):
+    try:
+        out["ip"] = socket.gethostbyname(hostname)
+    except Exception as e:
+        out["exc"] = e
+
+
 def run_dns(hostname, timeout=2.0):
-    start = time.monotonic()
+    start = time.perf_counter_ns()
     ip = None
     ok = False
     error = None
     error_kind = DNS_OK
 
-    # socket.gethostbyname doesn't accept a timeout param directly on all platforms.
-    # We use setdefaulttimeout briefly to approximate a per-call timeout.
-    old = socket.getdefaulttimeout()
+    # gethostbyname has no timeout of its own (the system resolver ignores
+    # socket.setdefaulttimeout, which is process-global anyway and unsafe with
+    # probes running in parallel). Run it on a daemon thread and stop waiting
+    # after `timeout`; a lookup that overruns finishes in the background.
+    out = {}
+    worker = threading.Thread(target=_lookup, args=(hostname, out), name="netinsight-dns", daemon=True)
+    worker.start()
+    worker.join(timeout)
     try:
-        socket.setdefaulttimeout(timeout)
-        ip = socket.gethostbyname(hostname)
+        if worker.is_alive():
+            raise socket.timeout("timed out")
+        if "exc" in out:
+            raise out["exc"]
+        ip = out["ip"]
         ok = True
     except socket.gaierror as e:
         error = str(e)
@@ -30,10 +46,8 @@ def run_dns(hostname, timeout=2.0):
     except Exception as e:
         error = str(e)
         error_kind = DNS_EXCEPTION
-    finally:
-        socket.setdefaulttimeout(old)
 
-    dns_ms = (time.monotonic() - start) * 1000.0
+    dns_ms = (time.perf_counter_ns() - start) / 1_000_000.0
     return {
         "hostname": hostname,
         "ok": ok,
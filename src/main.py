@@ -7,20 +7,24 @@ import logging
 import tempfile
 import os
 import re
+import signal
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from .csv_log import make_row, append_rows, utc_now_iso
+from .csv_log import make_row, append_rows, utc_now_iso, reset_csv_cache
 from .logging_setup import setup_logging
 from . import targets_config
 from . import ping_check
 from . import dns_check
+from . import dns_cache
 from . import http_check
 from . import net_utils
 from .error_kinds import (
     CONFIG_MISSING_HOSTNAME,
     CONFIG_MISSING_URL,
     CONFIG_MISSING_GATEWAY,
+    PING_UNKNOWN_HOST,
 )
 
 LOG = logging.getLogger("netinsight.main")
@@ -28,6 +32,8 @@ LOG = logging.getLogger("netinsight.main")
 INTERVAL_SECONDS = 30
 LOG_PATH = "data/netinsight_log.csv"
 DEFAULT_TARGETS_JSON = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "targets.json"))
+# services are probed concurrently; each worker mostly waits on ping/DNS/HTTP I/O
+_SERVICE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="netinsight-svc")
 
 
 def persist_gateway(gateway_ip, targets_file_path=None, targets_module=None, overwrite=False, write_file=False):
@@ -207,18 +213,156 @@ def _load_services_from_file(path):
 
 
 def _default_services():
-    # Prefer the JSON config under config/targets.json if present
-    if os.path.exists(DEFAULT_TARGETS_JSON):
-        try:
-            with open(DEFAULT_TARGETS_JSON, "r", encoding="utf-8") as f:
-                j = json.load(f)
-            svcs = j.get("SERVICES")
-            if isinstance(svcs, list):
-                return svcs
-        except Exception:
-            pass
-    # fall back to targets_config module values
-    return getattr(targets_config, "SERVICES", [])
+    # config/targets.json, parsed once and cached by targets_config
+    return targets_config.get_services()
+
+
+def _probe_service(svc, round_id, gateway_override=None):
+    """Run the enabled probes of one service; returns (rows, ping_count, dns_count, http_count)."""
+    rows = []
+    ping_count = dns_count = http_count = 0
+
+    name = svc.get("name", "")
+    tags = svc.get("tags", []) or []
+    url = svc.get("url", "") or ""
+
+    hostname, missing_kind = _resolve_hostname(svc.get("hostname"), tags, gateway_override=gateway_override)
+
+    # PING
+    ping_cfg = svc.get("ping", {}) or {}
+    if ping_cfg.get("enabled"):
+        if not hostname:
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname="",
+                    url=url,
+                    tags=",".join(tags),
+                    probe_type="ping",
+                    success=False,
+                    error_kind=missing_kind or CONFIG_MISSING_HOSTNAME,
+                    error_message="hostname missing for ping",
+                    details=json.dumps({"reason": "missing hostname"}, separators=(",", ":")),
+                )
+            )
+        else:
+            # ping the cached address so each round doesn't re-resolve; the row keeps the hostname
+            target = dns_cache.resolve(hostname) or hostname
+            r = ping_check.run_ping(target, count=ping_cfg.get("count", 3), timeout=ping_cfg.get("timeout", 1.0))
+            success = (r.get("received", 0) > 0)
+            if r.get("error_kind") == PING_UNKNOWN_HOST:
+                # name didn't resolve; don't keep serving an address for it
+                dns_cache.invalidate(hostname)
+            details = {
+                "sent": r.get("sent"),
+                "received": r.get("received"),
+                "latencies_ms": r.get("latencies_ms") or [],
+                "partial_success": bool(success and (r.get("packet_loss_pct") or 0) > 0),
+            }
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname=hostname,
+                    url=url,
+                    tags=",".join(tags),
+                    probe_type="ping",
+                    success=success,
+                    latency_ms=r.get("latency_avg_ms"),
+                    latency_p95_ms=r.get("latency_p95_ms"),
+                    jitter_ms=r.get("jitter_ms"),
+                    packet_loss_pct=r.get("packet_loss_pct"),
+                    error_kind=r.get("error_kind"),
+                    error_message=r.get("error"),
+                    details=json.dumps(details, separators=(",", ":")),
+                )
+            )
+        ping_count += 1
+
+    # DNS
+    dns_cfg = svc.get("dns", {}) or {}
+    if dns_cfg.get("enabled"):
+        if not hostname:
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname="",
+                    url=url,
+                    tags=",".join(tags),
+                    probe_type="dns",
+                    success=False,
+                    error_kind=missing_kind or CONFIG_MISSING_HOSTNAME,
+                    error_message="hostname missing for dns",
+                    details=json.dumps({"reason": "missing hostname"}, separators=(",", ":")),
+                )
+            )
+        else:
+            r = dns_check.run_dns(hostname, timeout=dns_cfg.get("timeout", 2.0))
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname=hostname,
+                    url=url,
+                    tags=",".join(tags),
+                    probe_type="dns",
+                    success=bool(r.get("ok")),
+                    latency_ms=r.get("dns_ms"),
+                    error_kind=r.get("error_kind"),
+                    error_message=r.get("error"),
+                    details=json.dumps({"ip": r.get("ip")}, separators=(",", ":")),
+                )
+            )
+        dns_count += 1
+
+    # HTTP
+    http_cfg = svc.get("http", {}) or {}
+    if http_cfg.get("enabled"):
+        if not url:
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname=hostname or "",
+                    url="",
+                    tags=",".join(tags),
+                    probe_type="http",
+                    success=False,
+                    error_kind=CONFIG_MISSING_URL,
+                    error_message="url missing",
+                    details=json.dumps({"reason": "missing url"}, separators=(",", ":")),
+                )
+            )
+        else:
+            r = http_check.run_http(url, timeout=http_cfg.get("timeout", 3.0))
+            details = {"status_class": r.get("status_class"), "bytes": r.get("bytes"), "redirects": r.get("redirects")}
+            rows.append(
+                make_row(
+                    mode="baseline",
+                    round_id=round_id,
+                    service_name=name,
+                    hostname=hostname or "",
+                    url=url,
+                    tags=",".join(tags),
+                    probe_type="http",
+                    success=bool(r.get("ok")),
+                    latency_ms=r.get("http_ms"),
+                    status_code=r.get("status_code"),
+                    error_kind=r.get("error_kind"),
+                    error_message=r.get("error"),
+                    details=json.dumps(details, separators=(",", ":")),
+                )
+            )
+        http_count += 1
+
+    return rows, ping_count, dns_count, http_count
 
 
 def run_once(round_id=None, services=None, log_path=None, gateway_override=None):
@@ -232,141 +376,14 @@ def run_once(round_id=None, services=None, log_path=None, gateway_override=None)
     rows = []
     ping_count = dns_count = http_count = 0
 
-    for svc in services:
-        name = svc.get("name", "")
-        tags = svc.get("tags", []) or []
-        url = svc.get("url", "") or ""
-
-        hostname, missing_kind = _resolve_hostname(svc.get("hostname"), tags, gateway_override=gateway_override)
-
-        # PING
-        ping_cfg = svc.get("ping", {}) or {}
-        if ping_cfg.get("enabled"):
-            if not hostname:
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname="",
-                        url=url,
-                        tags=",".join(tags),
-                        probe_type="ping",
-                        success=False,
-                        error_kind=missing_kind or CONFIG_MISSING_HOSTNAME,
-                        error_message="hostname missing for ping",
-                        details=json.dumps({"reason": "missing hostname"}, separators=(",", ":")),
-                    )
-                )
-            else:
-                r = ping_check.run_ping(hostname, count=ping_cfg.get("count", 3), timeout=ping_cfg.get("timeout", 1.0))
-                success = (r.get("received", 0) > 0)
-                details = {
-                    "sent": r.get("sent"),
-                    "received": r.get("received"),
-                    "latencies_ms": r.get("latencies_ms") or [],
-                    "partial_success": bool(success and (r.get("packet_loss_pct") or 0) > 0),
-                }
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname=hostname,
-                        url=url,
-                        tags=",".join(tags),
-                        probe_type="ping",
-                        success=success,
-                        latency_ms=r.get("latency_avg_ms"),
-                        latency_p95_ms=r.get("latency_p95_ms"),
-                        jitter_ms=r.get("jitter_ms"),
-                        packet_loss_pct=r.get("packet_loss_pct"),
-                        error_kind=r.get("error_kind"),
-                        error_message=r.get("error"),
-                        details=json.dumps(details, separators=(",", ":")),
-                    )
-                )
-            ping_count += 1
-
-        # DNS
-        dns_cfg = svc.get("dns", {}) or {}
-        if dns_cfg.get("enabled"):
-            if not hostname:
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname="",
-                        url=url,
-                        tags=",".join(tags),
-                        probe_type="dns",
-                        success=False,
-                        error_kind=missing_kind or CONFIG_MISSING_HOSTNAME,
-                        error_message="hostname missing for dns",
-                        details=json.dumps({"reason": "missing hostname"}, separators=(",", ":")),
-                    )
-                )
-            else:
-                r = dns_check.run_dns(hostname, timeout=dns_cfg.get("timeout", 2.0))
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname=hostname,
-                        url=url,
-                        tags=",".join(tags),
-                        probe_type="dns",
-                        success=bool(r.get("ok")),
-                        latency_ms=r.get("dns_ms"),
-                        error_kind=r.get("error_kind"),
-                        error_message=r.get("error"),
-                        details=json.dumps({"ip": r.get("ip")}, separators=(",", ":")),
-                    )
-                )
-            dns_count += 1
-
-        # HTTP
-        http_cfg = svc.get("http", {}) or {}
-        if http_cfg.get("enabled"):
-            if not url:
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname=hostname or "",
-                        url="",
-                        tags=",".join(tags),
-                        probe_type="http",
-                        success=False,
-                        error_kind=CONFIG_MISSING_URL,
-                        error_message="url missing",
-                        details=json.dumps({"reason": "missing url"}, separators=(",", ":")),
-                    )
-                )
-            else:
-                r = http_check.run_http(url, timeout=http_cfg.get("timeout", 3.0))
-                details = {"status_class": r.get("status_class"), "bytes": r.get("bytes"), "redirects": r.get("redirects")}
-                rows.append(
-                    make_row(
-                        mode="baseline",
-                        round_id=round_id,
-                        service_name=name,
-                        hostname=hostname or "",
-                        url=url,
-                        tags=",".join(tags),
-                        probe_type="http",
-                        success=bool(r.get("ok")),
-                        latency_ms=r.get("http_ms"),
-                        status_code=r.get("status_code"),
-                        error_kind=r.get("error_kind"),
-                        error_message=r.get("error"),
-                        details=json.dumps(details, separators=(",", ":")),
-                    )
-                )
-            http_count += 1
+    # services are independent, so a round takes as long as the slowest one
+    # rather than the sum of all of them; map() keeps rows in config order
+    results = _SERVICE_POOL.map(lambda svc: _probe_service(svc, round_id, gateway_override), services)
+    for svc_rows, n_ping, n_dns, n_http in results:
+        rows.extend(svc_rows)
+        ping_count += n_ping
+        dns_count += n_dns
+        http_count += n_http
 
     append_rows(log_path, rows)
 
@@ -400,6 +417,33 @@ def _rotate_if_requested(path):
         print("Rotated existing log %s -> %s" % (path, new_name))
 
 
+def _install_sighup_handler():
+    """
+    On SIGHUP (e.g. sent by logrotate), forget cached CSV state so the next
+    round recreates the directory/header of a rotated log, and re-read
+    config/targets.json.
+
+    Only taken over when SIGHUP is already ignored (started under nohup or
+    detached); an interactive run keeps the default and stops when its
+    terminal closes.
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return
+    if signal.getsignal(signal.SIGHUP) is not signal.SIG_IGN:
+        return
+
+    def _on_sighup(signum, frame):
+        reset_csv_cache()
+        targets_config.reload()
+        LOG.info("SIGHUP received; CSV paths will be re-checked and targets reloaded on next round")
+
+    try:
+        signal.signal(signal.SIGHUP, _on_sighup)
+    except ValueError:
+        # not in the main thread
+        LOG.debug("Could not install SIGHUP handler", exc_info=True)
+
+
 def main():
     setup_logging()
     args = _parse_args()
@@ -434,14 +478,23 @@ def main():
         print("Completed run %s rows=%s failures=%s output=%s" % (summary["round_id"], summary["total_rows"], summary["failures"], args.output))
         return
 
+    _install_sighup_handler()
     print("NetInsight running. Press Ctrl+C to stop. Output:", args.output)
     try:
+        # rounds start every args.interval seconds regardless of how long a round takes
+        next_tick = time.monotonic()
         while True:
             try:
                 run_once(log_path=args.output, gateway_override=args.gateway, services=services)
             except Exception:
                 LOG.exception("Unhandled exception during run_once; continuing")
-            time.sleep(args.interval)
+            next_tick += args.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # round overran the interval: start the next one now, don't burst to catch up
+                next_tick = time.monotonic()
     except KeyboardInterrupt:
         print("NetInsight stopped.")
         LOG.info("NetInsight stopped by user (KeyboardInterrupt).")
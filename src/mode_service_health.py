@@ -5,80 +5,120 @@ Provides classify_service_state() and run_service_health().
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
 
 from .csv_log import make_row, append_rows, utc_now_iso
 from .logging_setup import setup_logging
 from . import ping_check
 from . import dns_check
 from . import http_check
-from .error_kinds import PING_EXCEPTION, DNS_EXCEPTION, HTTP_EXCEPTION
+from .error_kinds import (
+    PING_EXCEPTION,
+    PING_TIMEOUT,
+    DNS_EXCEPTION,
+    DNS_TIMEOUT,
+    HTTP_EXCEPTION,
+    HTTP_TIMEOUT,
+)
 
 LOG = logging.getLogger("netinsight.service_health")
 LOG_PATH = os.path.join("data", "netinsight_service_health.csv")
 
+PING_COUNT = 2
+PING_TIMEOUT_S = 1.5  # per reply
+DNS_TIMEOUT_S = 2.5
+HTTP_TIMEOUT_S = 5.0
+# Longest each probe can run on its own timeouts: run_ping kills ping after
+# command_timeout(), and requests applies HTTP_TIMEOUT_S to the connect and
+# again to the read.
+PING_MAX_S = ping_check.command_timeout(PING_COUNT, PING_TIMEOUT_S)
+HTTP_MAX_S = 2 * HTTP_TIMEOUT_S
+# Wall-clock wait for one domain, derived from those bounds so it never cuts a
+# probe short of its own timeout; a probe reported as timed out here is one
+# that is about to give up anyway.
+PROBE_DEADLINE_S = max(PING_MAX_S, DNS_TIMEOUT_S, HTTP_MAX_S) + 0.25
+
+# Shared across calls so repeated checks don't pay for thread start-up.
+_PROBE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="netinsight-probe")
+
+# Fallback results per probe: (error_kind on exception, error_kind on deadline, base dict)
+_PROBE_FALLBACKS = {
+    "ping": (PING_EXCEPTION, PING_TIMEOUT, {"received": 0}),
+    "dns": (DNS_EXCEPTION, DNS_TIMEOUT, {"ok": False, "ip": None}),
+    "http": (HTTP_EXCEPTION, HTTP_TIMEOUT, {"ok": False}),
+}
+
+
+def _probe_result(name: str, fut) -> dict:
+    exc_kind, timeout_kind, base = _PROBE_FALLBACKS[name]
+    if not fut.done():
+        # a running future can't be cancelled; it ends on its own timeout
+        return {**base, "error_kind": timeout_kind, "error": f"{name} probe did not finish within {PROBE_DEADLINE_S:.2f}s"}
+    try:
+        return fut.result()
+    except Exception as e:
+        return {**base, "error_kind": exc_kind, "error": str(e)}
 
-def classify_service_state(ping_r, dns_r, http_r):
+
+def classify_service_state(ping_r: dict, dns_r: dict, http_r: Optional[dict]) -> str:
     # DNS failing first
     if not dns_r.get("ok"):
         msg = (dns_r.get("error") or "").lower()
-        if "name or service not known" in msg or "not known" in msg:
+        if "not known" in msg:
             return "possible_blocked_or_restricted"
-        if "timeout" in msg or "gaierror" in msg:
-            return "dns_failure"
         return "dns_failure"
 
     # If HTTP OK -> healthy
     if http_r and http_r.get("ok"):
         return "healthy"
 
-    # HTTP present but not ok
-    if http_r:
-        sc = http_r.get("status_class") or ""
-        if sc == "5xx":
-            return "service_server_error"
-        if sc == "4xx":
-            return "client_or_access_error"
-
-        ek = (http_r.get("error_kind") or "").lower()
-        if "timeout" in ek:
-            if ping_r.get("received", 0) > 0:
-                return "connection_issue_or_blocked"
-            return "connectivity_issue_or_firewall"
-        if "ssl" in ek or "connection" in ek:
-            if ping_r.get("received", 0) > 0:
-                return "connection_issue_or_blocked"
-            return "connectivity_issue_or_firewall"
+    ping_reachable = ping_r.get("received", 0) > 0
 
     # HTTP missing
     if not http_r:
-        if ping_r.get("received", 0) == 0:
+        if not ping_reachable:
             return "connectivity_issue_or_firewall"
         return "inconclusive"
 
+    # HTTP present but not ok
+    sc = http_r.get("status_class") or ""
+    if sc == "5xx":
+        return "service_server_error"
+    if sc == "4xx":
+        return "client_or_access_error"
+
+    ek = (http_r.get("error_kind") or "").lower()
+    if "timeout" in ek or "ssl" in ek or "connection" in ek:
+        if ping_reachable:
+            return "connection_issue_or_blocked"
+        return "connectivity_issue_or_firewall"
+
     return "inconclusive"
 
 
-def run_service_health(domain, log_path=None):
+def run_service_health(domain, log_path=None, session=None):
+    """
+    Probe one domain and append a service_health row. HTTP goes through
+    http_check's pooled session unless a requests.Session is passed.
+    """
     if log_path is None:
         log_path = LOG_PATH
 
     round_id = utc_now_iso()
     url = f"https://{domain}"
 
-    try:
-        ping_r = ping_check.run_ping(domain, count=2, timeout=1.5)
-    except Exception as e:
-        ping_r = {"received": 0, "error_kind": PING_EXCEPTION, "error": str(e)}
-
-    try:
-        dns_r = dns_check.run_dns(domain, timeout=2.5)
-    except Exception as e:
-        dns_r = {"ok": False, "ip": None, "error_kind": DNS_EXCEPTION, "error": str(e)}
-
-    try:
-        http_r = http_check.run_http(url, timeout=5.0)
-    except Exception as e:
-        http_r = {"ok": False, "error_kind": HTTP_EXCEPTION, "error": str(e)}
+    # The three probes are independent; run them side by side.
+    futures = {
+        "ping": _PROBE_POOL.submit(ping_check.run_ping, domain, count=PING_COUNT, timeout=PING_TIMEOUT_S),
+        "dns": _PROBE_POOL.submit(dns_check.run_dns, domain, timeout=DNS_TIMEOUT_S),
+        "http": _PROBE_POOL.submit(http_check.run_http, url, timeout=HTTP_TIMEOUT_S, session=session),
+    }
+    wait(futures.values(), timeout=PROBE_DEADLINE_S)
+
+    ping_r = _probe_result("ping", futures["ping"])
+    dns_r = _probe_result("dns", futures["dns"])
+    http_r = _probe_result("http", futures["http"])
 
     state = classify_service_state(ping_r, dns_r, http_r)
 
@@ -37,6 +37,39 @@ CSV_HEADERS = [
     "error",
 ]
 
+# Paths already rotated/verified in this process (see _append_row).
+_csv_ready: set[str] = set()
+
+
+def _str_or_empty(value) -> str:
+    return str(value or "")
+
+
+def _float_or_none(value):
+    return None if value is None else float(value)
+
+
+def _identity(value):
+    return value
+
+
+# Per-column CSV converters; columns not listed are written as-is.
+_CONVERTERS = {
+    "ping_ms": _float_or_none,
+    "download_mbps": _float_or_none,
+    "upload_mbps": _float_or_none,
+    "server_name": _str_or_empty,
+    "server_country": _str_or_empty,
+    "server_sponsor": _str_or_empty,
+    "server_id": _str_or_empty,
+    "server_host": _str_or_empty,
+    "error": _str_or_empty,
+}
+
+
+def _encode(row: dict) -> dict:
+    return {k: _CONVERTERS.get(k, _identity)(row.get(k)) for k in CSV_HEADERS}
+
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -67,15 +100,17 @@ def _rotate_if_header_mismatch(path: str, expected_header: list[str]) -> None:
 
 
 def _append_row(path: str, row: dict) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    _rotate_if_header_mismatch(path, CSV_HEADERS)
+    if path not in _csv_ready:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _rotate_if_header_mismatch(path, CSV_HEADERS)
+        _csv_ready.add(path)
 
-    file_exists = os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
+    # a+ positions at end of file, so tell() == 0 means the file is new or empty
+    with open(path, "a+", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        if not file_exists:
+        if f.tell() == 0:
             w.writeheader()
-        w.writerow(row)
+        w.writerow(_encode(row))
 
 
 def run_speedtest(log_path: str = LOG_PATH):
@@ -113,11 +148,11 @@ def run_speedtest(log_path: str = LOG_PATH):
         row["ping_ms"] = ping
         row["download_mbps"] = dl_bps / 1_000_000.0
         row["upload_mbps"] = ul_bps / 1_000_000.0
-        row["server_name"] = str(server.get("name", "") or "")
-        row["server_country"] = str(server.get("country", "") or "")
-        row["server_sponsor"] = str(server.get("sponsor", "") or "")
-        row["server_id"] = str(server.get("id", "") or "")
-        row["server_host"] = str(server.get("host", "") or "")
+        row["server_name"] = server.get("name")
+        row["server_country"] = server.get("country")
+        row["server_sponsor"] = server.get("sponsor")
+        row["server_id"] = server.get("id")
+        row["server_host"] = server.get("host")
 
         _append_row(log_path, row)
 
@@ -126,8 +161,8 @@ def run_speedtest(log_path: str = LOG_PATH):
             float(row["ping_ms"]) if row["ping_ms"] is not None else -1.0,
             float(row["download_mbps"]) if row["download_mbps"] is not None else -1.0,
             float(row["upload_mbps"]) if row["upload_mbps"] is not None else -1.0,
-            row["server_name"],
-            row["server_country"],
+            _str_or_empty(row["server_name"]),
+            _str_or_empty(row["server_country"]),
         )
         return {
             "ping_ms": row["ping_ms"],
@@ -10,10 +10,12 @@ Behavior:
 - If no gateway found, the gateway rows are written with error_kind=config_missing_gateway.
 """
 import argparse
-import json
 import logging
 import os
+import statistics
 import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from .csv_log import make_row, append_rows, utc_now_iso
@@ -26,14 +28,25 @@ from .error_kinds import CONFIG_MISSING_GATEWAY, PING_EXCEPTION
 LOG = logging.getLogger("netinsight.wifi_diag")
 LOG_PATH = os.path.join("data", "netinsight_wifi_diag.csv")
 
+# Pending rows are written out once this many accumulate (and at the end of the run).
+FLUSH_EVERY_ROWS = 64
 
-def run_wifi_diag(rounds=10, interval=1.0, gateway_host=None, external_host=None, log_path=None):
+
+def _ping_once(host, timeout):
+    try:
+        return ping_check.run_ping(host, count=1, timeout=timeout)
+    except Exception as e:
+        return {"received": 0, "latency_avg_ms": None, "error_kind": PING_EXCEPTION, "error": str(e)}
+
+
+def run_wifi_diag(rounds=10, interval=1.0, gateway_host=None, external_host=None, log_path=None, detect_gateway=True):
     """
     Runs the wifi diagnostic and writes rows to log_path. Returns diagnosis string.
     - rounds: number of samples (small int)
     - interval: seconds between samples
     - gateway_host: IP string or None
     - external_host: external host name or IP (defaults to targets_config.WIFI_DIAG_EXTERNAL_HOST)
+    - detect_gateway: auto-detect when gateway_host is None (callers that already tried pass False)
     """
     if log_path is None:
         log_path = LOG_PATH
@@ -42,91 +55,102 @@ def run_wifi_diag(rounds=10, interval=1.0, gateway_host=None, external_host=None
         external_host = getattr(targets_config, "WIFI_DIAG_EXTERNAL_HOST", "www.google.com")
 
     # If gateway_host is None, try auto-detect (net_utils honors NETINSIGHT_GATEWAY_IP env)
-    if gateway_host is None:
+    if gateway_host is None and detect_gateway:
         gateway_host = net_utils.get_default_gateway_ip()
 
     round_id = utc_now_iso()
     LOG.info("wifi_diag: gateway=%s external=%s rounds=%s interval=%s", gateway_host, external_host, rounds, interval)
 
     rows = []
-    gw_lats = []
-    ex_lats = []
+    # only numeric samples are kept, so the summary needs no filtering pass
+    gw_lats = array("d")
+    ex_lats = array("d")
     gw_ok = 0
     ex_ok = 0
 
-    for i in range(rounds):
-        # Gateway probe
-        if gateway_host:
-            try:
-                rgw = ping_check.run_ping(gateway_host, count=1, timeout=1.0)
-            except Exception as e:
-                rgw = {"received": 0, "latency_avg_ms": None, "error_kind": PING_EXCEPTION, "error": str(e)}
-            gw_lats.append(rgw.get("latency_avg_ms"))
-            if rgw.get("received", 0) > 0:
-                gw_ok += 1
-
-            rows.append(
-                make_row(
-                    mode="wifi_diag",
-                    round_id=round_id,
-                    service_name="gateway",
-                    hostname=gateway_host,
-                    probe_type="ping",
-                    success=(rgw.get("received", 0) > 0),
-                    latency_ms=rgw.get("latency_avg_ms"),
-                    error_kind=rgw.get("error_kind"),
-                    error_message=rgw.get("error") or "",
-                    details=json.dumps({"round": i + 1}, separators=(",", ":"), sort_keys=True),
+    # make_row arguments that are the same for every round of a role
+    gw_base = dict(mode="wifi_diag", round_id=round_id, service_name="gateway", hostname=gateway_host or "", probe_type="ping")
+    ex_base = dict(mode="wifi_diag", round_id=round_id, service_name="external", hostname=external_host, probe_type="ping")
+
+    # Gateway and external probes are independent and mostly wait on the network,
+    # so each round runs them side by side; rows are still built here in order.
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="netinsight-wifi-diag") as pool:
+        for i in range(rounds):
+            gw_future = pool.submit(_ping_once, gateway_host, 1.0) if gateway_host else None
+            ex_future = pool.submit(_ping_once, external_host, 1.5)
+            # same bytes as json.dumps({"round": n}, separators=(",", ":"))
+            details = f'{{"round":{i + 1}}}'
+            # both probes of a round run together, so their rows share one timestamp
+            ts = utc_now_iso()
+
+            # Gateway probe
+            if gw_future is not None:
+                rgw = gw_future.result()
+                # run_ping reports latency fields as float or None, never other types
+                if rgw.get("latency_avg_ms") is not None:
+                    gw_lats.append(rgw["latency_avg_ms"])
+                gw_up = rgw.get("received", 0) > 0
+                gw_ok += gw_up
+
+                rows.append(
+                    make_row(
+                        **gw_base,
+                        success=gw_up,
+                        latency_ms=rgw.get("latency_avg_ms"),
+                        error_kind=rgw.get("error_kind"),
+                        error_message=rgw.get("error") or "",
+                        details=details,
+                        timestamp=ts,
+                    )
                 )
-            )
-        else:
-            # explicit missing-gateway row
+            else:
+                # explicit missing-gateway row
+                rows.append(
+                    make_row(
+                        **gw_base,
+                        success=False,
+                        error_kind=CONFIG_MISSING_GATEWAY,
+                        error_message="gateway not detected",
+                        details=details,
+                        timestamp=ts,
+                    )
+                )
+
+            # External baseline probe
+            rex = ex_future.result()
+            if rex.get("latency_avg_ms") is not None:
+                ex_lats.append(rex["latency_avg_ms"])
+            ex_up = rex.get("received", 0) > 0
+            ex_ok += ex_up
+
             rows.append(
                 make_row(
-                    mode="wifi_diag",
-                    round_id=round_id,
-                    service_name="gateway",
-                    hostname="",
-                    probe_type="ping",
-                    success=False,
-                    error_kind=CONFIG_MISSING_GATEWAY,
-                    error_message="gateway not detected",
-                    details=json.dumps({"round": i + 1}, separators=(",", ":"), sort_keys=True),
+                    **ex_base,
+                    success=ex_up,
+                    latency_ms=rex.get("latency_avg_ms"),
+                    error_kind=rex.get("error_kind"),
+                    error_message=rex.get("error") or "",
+                    details=details,
+                    timestamp=ts,
                 )
             )
 
-        # External baseline probe
-        try:
-            rex = ping_check.run_ping(external_host, count=1, timeout=1.5)
-        except Exception as e:
-            rex = {"received": 0, "latency_avg_ms": None, "error_kind": PING_EXCEPTION, "error": str(e)}
-        ex_lats.append(rex.get("latency_avg_ms"))
-        if rex.get("received", 0) > 0:
-            ex_ok += 1
-
-        rows.append(
-            make_row(
-                mode="wifi_diag",
-                round_id=round_id,
-                service_name="external",
-                hostname=external_host,
-                probe_type="ping",
-                success=(rex.get("received", 0) > 0),
-                latency_ms=rex.get("latency_avg_ms"),
-                error_kind=rex.get("error_kind"),
-                error_message=rex.get("error") or "",
-                details=json.dumps({"round": i + 1}, separators=(",", ":"), sort_keys=True),
-            )
-        )
+            if len(rows) >= FLUSH_EVERY_ROWS:
+                append_rows(log_path, rows)
+                rows = []
 
-        if interval and interval > 0:
-            time.sleep(interval)
+            # sample on a fixed cadence (probe time counts toward the interval);
+            # nothing to wait for after the last round
+            if interval and interval > 0 and i + 1 < rounds:
+                time.sleep(max(0.0, t0 + (i + 1) * interval - time.monotonic()))
 
-    append_rows(log_path, rows)
+    if rows:
+        append_rows(log_path, rows)
 
     # Compute medians & success rates
-    gw_med = _median([v for v in gw_lats if v is not None])
-    ex_med = _median([v for v in ex_lats if v is not None])
+    gw_med = _median(gw_lats)
+    ex_med = _median(ex_lats)
     gw_rate = gw_ok / rounds if rounds else 0
     ex_rate = ex_ok / rounds if rounds else 0
 
@@ -148,15 +172,16 @@ def run_wifi_diag(rounds=10, interval=1.0, gateway_host=None, external_host=None
         gw_med is not None and
         ex_med is not None
     ):
-        # Normalize gateway latency so ratios remain meaningful
-        gw_med_norm = max(gw_med, MIN_GATEWAY_LATENCY_MS)
+        # Normalize gateway latency so ratios remain meaningful; the floor also
+        # keeps the single division below safe (ex_med may be 0 for "time<1ms").
+        ratio = ex_med / max(gw_med, MIN_GATEWAY_LATENCY_MS)
 
         # ISP congestion: external much slower than gateway
-        if (ex_med / gw_med_norm) >= 4.0:
+        if ratio >= 4.0:
             diagnosis = "Likely ISP congestion (external latency >> gateway)."
 
         # Wi-Fi congestion: gateway much slower than external
-        elif (gw_med_norm / ex_med) >= 4.0:
+        elif ratio <= 0.25:
             diagnosis = "Likely Wi-Fi congestion (gateway latency >> external)."
 
 
@@ -166,14 +191,7 @@ def run_wifi_diag(rounds=10, interval=1.0, gateway_host=None, external_host=None
 
 
 def _median(values):
-    if not values:
-        return None
-    s = sorted(values)
-    n = len(s)
-    m = n // 2
-    if n % 2 == 1:
-        return s[m]
-    return (s[m - 1] + s[m]) / 2.0
+    return statistics.median(values) if values else None
 
 
 def _rotate_if_requested(path):
@@ -213,10 +231,10 @@ def main(argv=None):
     if gw_used:
         try:
             # import here to avoid top-level circular imports
-            from . import main
+            from . import main as main_mod
 
             # Default persist behavior will NOT overwrite a non-empty GATEWAY_HOSTNAME.
-            main.persist_gateway(
+            main_mod.persist_gateway(
                 gw_used,
                 targets_file_path=main_mod.DEFAULT_TARGETS_JSON,
                 targets_module=targets_config,
@@ -230,7 +248,15 @@ def main(argv=None):
 
 
 
-    diagnosis = run_wifi_diag(rounds=args.rounds, interval=args.interval, gateway_host=gw_used, external_host=args.external_host, log_path=args.log_path)
+    # gateway detection already ran above; don't repeat it when it found nothing
+    diagnosis = run_wifi_diag(
+        rounds=args.rounds,
+        interval=args.interval,
+        gateway_host=gw_used,
+        external_host=args.external_host,
+        log_path=args.log_path,
+        detect_gateway=False,
+    )
     print("wifi_diag:", diagnosis)
     return diagnosis
 
@@ -7,56 +7,141 @@ Order of checks:
  1) NETINSIGHT_GATEWAY_IP env var (explicit override)
  2) If WSL: prefer 127.0.1.1 then 127.0.0.1 when present (helps WSL loopback envs)
  3) macOS: `route get default` -> `netstat -rn`
- 4) Linux kernel default: /proc/net/route
+ 4) Linux kernel default: rtnetlink RTM_GETROUTE dump -> /proc/net/route
  5) `ip route get 1.1.1.1` -> take 'via <ip>' if present
  6) `ip route show default` -> take 'default via <ip>'
  7) `route -n` fallback
  8) Windows: `route print -4` parsing
  9) None if nothing found
+
+Every external command is capped at _CMD_TIMEOUT_S (2 s); a tool that hangs
+or times out just counts as "no answer" and detection moves to the next step.
+Successful results are cached for GATEWAY_CACHE_TTL_S.
 """
+import functools
 import os
 import platform
+import re
 import socket
 import struct
-import subprocess
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 LOG = logging.getLogger("netinsight.net_utils")
 
+# The OS can't change under a running process; look it up once.
+_SYSTEM = platform.system().lower()
+
+_PROC_NET_ROUTE = "/proc/net/route"
+_PROC_FIB_TRIE = "/proc/net/fib_trie"
+_ETC_HOSTS = "/etc/hosts"
+
+_WSL_RE = re.compile(rb"microsoft|wsl", re.IGNORECASE)
+
+# Route-tool output patterns; the captured token is still checked with _is_ipv4.
+_VIA_RE = re.compile(r"\bvia\s+(\S+)")
+_DEFAULT_VIA_RE = re.compile(r"(?m)^\s*default\b.*?\svia\s+(\S+)")
+_GW_RE = re.compile(r"(?m)^\s*gateway:\s*(\S+)")
+
+# Detected gateways are reused for this long; the default route rarely changes
+# and each detection may fork several route/ip subprocesses.
+GATEWAY_CACHE_TTL_S = 30.0
+_gateway_cache = {"ip": None, "t": 0.0}
+
+
+def invalidate_gateway_cache():
+    """Drop the cached gateway so the next lookup re-runs detection (e.g. after a network change)."""
+    _gateway_cache["ip"] = None
+    _gateway_cache["t"] = 0.0
+
+
+# Upper bound for one route/ip/netstat call so a hung tool can't stall detection.
+_CMD_TIMEOUT_S = 2.0
+
+
+def _run(cmd):
+    """
+    Run a route/ip helper command and return its combined output as text.
+    subprocess is imported lazily: on Linux the procfs paths usually answer
+    first and the module is never needed.
+    """
+    import subprocess
+
+    return subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, timeout=_CMD_TIMEOUT_S)
+
+
+def _is_ipv4(s):
+    """True for a strict dotted-quad IPv4 address other than 0.0.0.0."""
+    try:
+        return socket.inet_pton(socket.AF_INET, s) != b"\0\0\0\0"
+    except (OSError, TypeError):
+        return False
+
 
+def _read_small_file(path):
+    """
+    Read a small (procfs) file as bytes with raw os.read calls, skipping the
+    text/buffered IO layers. Returns None if the file can't be opened.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=1)
 def _is_wsl():
+    """True when running under WSL. The kernel doesn't change at runtime, so this is memoized."""
     try:
         # check /proc/version and /proc/sys/kernel/osrelease for WSL marker
-        if os.path.exists("/proc/version"):
-            with open("/proc/version", "r", encoding="utf-8") as f:
-                v = f.read().lower()
-            if "microsoft" in v or "wsl" in v:
-                return True
-        if os.path.exists("/proc/sys/kernel/osrelease"):
-            with open("/proc/sys/kernel/osrelease", "r", encoding="utf-8") as f:
-                v = f.read().lower()
-            if "microsoft" in v or "wsl" in v:
+        for path in ("/proc/version", "/proc/sys/kernel/osrelease"):
+            data = _read_small_file(path)
+            if data and _WSL_RE.search(data):
                 return True
     except Exception:
         pass
     return False
 
 
+def _local_address_present(addr):
+    """
+    Check /proc/net/fib_trie for addr as a /32 LOCAL entry (i.e. assigned to
+    this host, including loopback aliases). Returns None if the file is unavailable.
+    """
+    data = _read_small_file(_PROC_FIB_TRIE)
+    if data is None:
+        return None
+    pattern = rb"\|-- " + re.escape(addr.encode("ascii")) + rb"\n\s+/32 host LOCAL"
+    return re.search(pattern, data) is not None
+
+
 def _loopback_candidate_present(addr):
     """Return True if addr appears in /etc/hosts or on loopback interface."""
     try:
-        # /etc/hosts
-        if os.path.exists("/etc/hosts"):
-            with open("/etc/hosts", "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    if addr in line:
-                        return True
-        # ip addr show lo
+        # /etc/hosts: addr as the address column of a (non-comment) entry
+        data = _read_small_file(_ETC_HOSTS)
+        if data:
+            pattern = rb"(?m)^[ \t]*" + re.escape(addr.encode("ascii")) + rb"(?=\s)"
+            if re.search(pattern, data):
+                return True
+        # kernel's local address table (covers lo aliases) - no fork/exec needed
+        local = _local_address_present(addr)
+        if local is not None:
+            return local
+        # ip addr show lo (no procfs)
         try:
-            out = subprocess.check_output(["ip", "addr", "show", "lo"], stderr=subprocess.STDOUT, text=True)
+            out = _run(["ip", "addr", "show", "lo"])
             if addr in out:
                 return True
         except Exception:
@@ -72,22 +157,19 @@ def _parse_proc_net_route():
     Parse /proc/net/route and return gateway IP (string) or None.
     Kernel's default route (Destination 00000000) contains gateway in hex.
     """
-    path = "/proc/net/route"
-    if not os.path.exists(path):
+    data = _read_small_file(_PROC_NET_ROUTE)
+    if data is None:
         return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            lines = f.read().splitlines()
+        lines = data.decode("ascii").splitlines()
         for line in lines[1:]:
-            parts = line.strip().split()
-            if len(parts) < 3:
-                continue
-            dest_hex = parts[1]
-            gw_hex = parts[2]
-            if dest_hex != "00000000":
+            # Iface, Destination, Gateway are all we need; don't split the rest
+            parts = line.split(None, 4)
+            if len(parts) < 3 or parts[1] != "00000000":
                 continue
             try:
-                gw_ip = socket.inet_ntoa(struct.pack("<L", int(gw_hex, 16)))
+                # the kernel prints the gateway as a little-endian hex u32
+                gw_ip = socket.inet_ntoa(int(parts[2], 16).to_bytes(4, "little"))
                 if gw_ip and gw_ip != "0.0.0.0":
                     return gw_ip
             except Exception:
@@ -97,6 +179,96 @@ def _parse_proc_net_route():
     return None
 
 
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h)
+_NLMSG_HDR = struct.Struct("=LHHLL")  # len, type, flags, seq, pid
+_RTMSG = struct.Struct("=BBBBBBBBI")  # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+_RTATTR = struct.Struct("=HH")  # len, type
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_RTM_NEWROUTE = 24
+_RTM_GETROUTE = 26
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_RTN_UNICAST = 1
+_RT_TABLE_MAIN = 254
+_RTA_GATEWAY = 5
+_RTA_PRIORITY = 6
+_RTA_TABLE = 15
+
+
+def _align4(n):
+    return (n + 3) & ~3
+
+
+def _parse_rtnl_default_routes(data):
+    """
+    Walk one recv() worth of an RTM_NEWROUTE dump. Returns (routes, done):
+    routes is [(metric, gateway_ip)] for IPv4 default routes in the main table,
+    done is True once NLMSG_DONE (or an error) terminates the dump.
+    """
+    routes = []
+    done = False
+    off = 0
+    while off + _NLMSG_HDR.size <= len(data):
+        msg_len, msg_type, _flags, _seq, _pid = _NLMSG_HDR.unpack_from(data, off)
+        if msg_len < _NLMSG_HDR.size:
+            break
+        if msg_type in (_NLMSG_DONE, _NLMSG_ERROR):
+            done = True
+            break
+        body = off + _NLMSG_HDR.size
+        if msg_type == _RTM_NEWROUTE and body + _RTMSG.size <= off + msg_len:
+            family, dst_len, _src, _tos, table, _proto, _scope, rtype, _fl = _RTMSG.unpack_from(data, body)
+            if family == socket.AF_INET and dst_len == 0 and rtype == _RTN_UNICAST:
+                gateway = None
+                metric = 0
+                a = body + _RTMSG.size
+                end = off + msg_len
+                while a + _RTATTR.size <= end:
+                    rta_len, rta_type = _RTATTR.unpack_from(data, a)
+                    if rta_len < _RTATTR.size:
+                        break
+                    payload = data[a + _RTATTR.size:a + rta_len]
+                    if rta_type == _RTA_GATEWAY and len(payload) == 4:
+                        gateway = socket.inet_ntoa(payload)
+                    elif rta_type == _RTA_PRIORITY and len(payload) == 4:
+                        metric = struct.unpack("=I", payload)[0]
+                    elif rta_type == _RTA_TABLE and len(payload) == 4:
+                        table = struct.unpack("=I", payload)[0]
+                    a += _align4(rta_len)
+                if gateway and table == _RT_TABLE_MAIN:
+                    routes.append((metric, gateway))
+        off += _align4(msg_len)
+    return routes, done
+
+
+def _netlink_default_gateway():
+    """
+    Linux: ask the kernel for its IPv4 routes over rtnetlink (no fork/exec,
+    no text parsing) and return the lowest-metric default gateway, or None.
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        return None
+    req = _NLMSG_HDR.pack(
+        _NLMSG_HDR.size + _RTMSG.size, _RTM_GETROUTE, _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0
+    ) + _RTMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0, 0, 0)
+    routes = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as s:
+        s.settimeout(1.0)
+        s.sendall(req)
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            found, done = _parse_rtnl_default_routes(chunk)
+            routes.extend(found)
+            if done:
+                break
+    if not routes:
+        return None
+    return min(routes)[1]
+
+
 def _parse_ip_route_get_via():
     """
     Run `ip route get 1.1.1.1` and return the 'via' IP if present, else None.
@@ -104,47 +276,31 @@ def _parse_ip_route_get_via():
       "1.1.1.1 via 192.168.240.1 dev eth0 src 192.168.246.72 uid 1000"
     """
     try:
-        out = subprocess.check_output(["ip", "route", "get", "1.1.1.1"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["ip", "route", "get", "1.1.1.1"])
     except Exception:
         return None
-    for line in out.splitlines():
-        line = line.strip()
-        if " via " in line:
-            parts = line.split()
-            try:
-                idx = parts.index("via")
-                candidate = parts[idx + 1]
-                if candidate.count(".") == 3 and candidate != "0.0.0.0":
-                    return candidate
-            except Exception:
-                continue
+    for m in _VIA_RE.finditer(out):
+        if _is_ipv4(m.group(1)):
+            return m.group(1)
     return None
 
 
 def _parse_ip_route_default():
     """Return gateway from 'ip route show default' or None."""
     try:
-        out = subprocess.check_output(["ip", "route", "show", "default"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["ip", "route", "show", "default"])
     except Exception:
         return None
-    for line in out.splitlines():
-        line = line.strip()
-        if line.startswith("default") and " via " in line:
-            parts = line.split()
-            try:
-                idx = parts.index("via")
-                candidate = parts[idx + 1]
-                if candidate.count(".") == 3 and candidate != "0.0.0.0":
-                    return candidate
-            except Exception:
-                continue
+    for m in _DEFAULT_VIA_RE.finditer(out):
+        if _is_ipv4(m.group(1)):
+            return m.group(1)
     return None
 
 
 def _parse_route_n():
     """Fallback parse of 'route -n' output; return gateway or None."""
     try:
-        out = subprocess.check_output(["route", "-n"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["route", "-n"])
     except Exception:
         return None
     for line in out.splitlines():
@@ -157,7 +313,7 @@ def _parse_route_n():
             gw = cols[1]
             flags = cols[3] if len(cols) > 3 else ""
             if dest == "0.0.0.0" or "UG" in flags:
-                if gw.count(".") == 3 and gw != "0.0.0.0":
+                if _is_ipv4(gw):
                     return gw
     return None
 
@@ -169,19 +325,14 @@ def _parse_darwin_route_get_default():
         gateway: 192.168.1.1
     """
     try:
-        out = subprocess.check_output(["route", "get", "default"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["route", "get", "default"])
     except Exception:
         return None
 
-    for line in out.splitlines():
-        line = line.strip()
-        # "gateway: 192.168.1.1"
-        if line.startswith("gateway:"):
-            parts = line.split()
-            if len(parts) >= 2:
-                candidate = parts[1]
-                if candidate.count(".") == 3 and candidate != "0.0.0.0":
-                    return candidate
+    # "gateway: 192.168.1.1"
+    for m in _GW_RE.finditer(out):
+        if _is_ipv4(m.group(1)):
+            return m.group(1)
     return None
 
 
@@ -192,7 +343,7 @@ def _parse_darwin_netstat_default():
       default            192.168.1.1        UGSc           en0
     """
     try:
-        out = subprocess.check_output(["netstat", "-rn"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["netstat", "-rn"])
     except Exception:
         return None
 
@@ -207,7 +358,7 @@ def _parse_darwin_netstat_default():
         # Expect 'default <gateway> ...'
         if cols and cols[0] == "default" and len(cols) >= 2:
             candidate = cols[1]
-            if candidate.count(".") == 3 and candidate != "0.0.0.0":
+            if _is_ipv4(candidate):
                 return candidate
     return None
 
@@ -218,7 +369,7 @@ def _parse_windows_route_print():
     We look for a line with '0.0.0.0 0.0.0.0 <gateway> ...'.
     """
     try:
-        out = subprocess.check_output(["route", "print", "-4"], stderr=subprocess.STDOUT, text=True)
+        out = _run(["route", "print", "-4"])
     except Exception:
         return None
 
@@ -233,14 +384,49 @@ def _parse_windows_route_print():
         if len(parts) >= 3:
             if parts[0] == "0.0.0.0" and parts[1] == "0.0.0.0":
                 candidate = parts[2]
-                if candidate.count(".") == 3 and candidate != "0.0.0.0":
+                if _is_ipv4(candidate):
                     return candidate
     return None
 
 
+# Text-tool fallbacks in priority order (module docstring steps 5-7).
+_TEXT_ROUTE_FALLBACKS = (
+    ("'ip route get' via", _parse_ip_route_get_via),
+    ("'ip route show default'", _parse_ip_route_default),
+    ("'route -n'", _parse_route_n),
+)
+
+
+def _first_text_route_gateway():
+    """
+    Run the text-tool fallbacks concurrently (each is an independent fork/exec)
+    but pick the answer by priority order, so the result matches the serial
+    chain. Returns as soon as the best available answer is known.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(_TEXT_ROUTE_FALLBACKS), thread_name_prefix="netinsight-gw")
+    try:
+        futures = [(label, pool.submit(fn)) for label, fn in _TEXT_ROUTE_FALLBACKS]
+        for label, fut in futures:
+            try:
+                gw = fut.result()
+            except Exception:
+                LOG.debug("%s failed", label, exc_info=True)
+                continue
+            if gw:
+                LOG.debug("%s candidate: %s", label, gw)
+                return gw
+        return None
+    finally:
+        # lower-priority commands still running are bounded by _CMD_TIMEOUT_S
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 def get_default_gateway_ip():
     """
     Return the default gateway IP (IPv4 dotted string) or None if not found.
+
+    A detected gateway is cached for GATEWAY_CACHE_TTL_S seconds; misses are not
+    cached, and the env override is always honored immediately.
     """
     # 1) Env override
     env = os.environ.get("NETINSIGHT_GATEWAY_IP")
@@ -248,11 +434,22 @@ def get_default_gateway_ip():
         LOG.debug("Using NETINSIGHT_GATEWAY_IP=%s", env)
         return env.strip()
 
-    system = platform.system().lower()
+    now = time.monotonic()
+    if _gateway_cache["ip"] is not None and now - _gateway_cache["t"] < GATEWAY_CACHE_TTL_S:
+        return _gateway_cache["ip"]
+
+    gw = _detect_default_gateway_ip()
+    if gw:
+        _gateway_cache["ip"] = gw
+        _gateway_cache["t"] = now
+    return gw
 
+
+def _detect_default_gateway_ip():
+    """Run the platform detection chain (steps 2-9 in the module docstring)."""
     # 2) WSL loopback preference (only on Linux/WSL)
     try:
-        if system.startswith("linux") and _is_wsl():
+        if _SYSTEM.startswith("linux") and _is_wsl():
             for cand in ("127.0.1.1", "127.0.0.1"):
                 if _loopback_candidate_present(cand):
                     LOG.debug("WSL detected - using loopback candidate: %s", cand)
@@ -262,7 +459,7 @@ def get_default_gateway_ip():
 
     # 3) macOS detection
     try:
-        if system.startswith("darwin"):
+        if _SYSTEM.startswith("darwin"):
             gw = _parse_darwin_route_get_default() or _parse_darwin_netstat_default()
             if gw:
                 LOG.debug("macOS default gateway candidate: %s", gw)
@@ -270,45 +467,32 @@ def get_default_gateway_ip():
     except Exception:
         LOG.debug("macOS gateway detection failed", exc_info=True)
 
-    # 4) /proc/net/route (Linux kernel default route)
-    try:
-        gw = _parse_proc_net_route()
-        if gw:
-            LOG.debug("Kernel default gateway (from /proc/net/route): %s", gw)
-            return gw
-    except Exception:
-        LOG.debug("Reading /proc/net/route failed", exc_info=True)
-
-    # 5) ip route get via
+    # 4) Linux kernel default route: rtnetlink, then /proc/net/route
     try:
-        gw = _parse_ip_route_get_via()
-        if gw:
-            LOG.debug("'ip route get' via candidate: %s", gw)
-            return gw
+        if _SYSTEM.startswith("linux"):
+            gw = _netlink_default_gateway()
+            if gw:
+                LOG.debug("Kernel default gateway (from rtnetlink): %s", gw)
+                return gw
     except Exception:
-        LOG.debug("'ip route get' failed", exc_info=True)
+        LOG.debug("rtnetlink route dump failed", exc_info=True)
 
-    # 6) ip route show default
     try:
-        gw = _parse_ip_route_default()
+        gw = _parse_proc_net_route()
         if gw:
-            LOG.debug("'ip route show default' candidate: %s", gw)
+            LOG.debug("Kernel default gateway (from /proc/net/route): %s", gw)
             return gw
     except Exception:
-        LOG.debug("'ip route show default' failed", exc_info=True)
+        LOG.debug("Reading /proc/net/route failed", exc_info=True)
 
-    # 7) route -n fallback (Linux)
-    try:
-        gw = _parse_route_n()
-        if gw:
-            LOG.debug("'route -n' candidate: %s", gw)
-            return gw
-    except Exception:
-        LOG.debug("'route -n' failed", exc_info=True)
+    # 5-7) ip route get / ip route show default / route -n
+    gw = _first_text_route_gateway()
+    if gw:
+        return gw
 
     # 8) Windows route print
     try:
-        if system.startswith("win"):
+        if _SYSTEM.startswith("win"):
             gw = _parse_windows_route_print()
             if gw:
                 LOG.debug("Windows default gateway candidate: %s", gw)
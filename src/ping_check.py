@@ -6,8 +6,11 @@ Returns a dict with keys:
   latency_min_ms, latency_max_ms, latency_avg_ms, latency_p95_ms,
   jitter_ms, elapsed_ms, error_kind, error
 """
+import heapq
+import math
 import platform
 import re
+import shutil
 import subprocess
 import time
 
@@ -22,8 +25,12 @@ from .error_kinds import (
     PING_UNKNOWN_HOST,
 )
 
-# simple regex to parse time=12.3 ms or time<1ms
-_TIME_RE = re.compile(r"time[=<]\s*([0-9]+(?:\.[0-9]+)?)\s*ms", re.IGNORECASE)
+# Absolute path resolved once: skips the PATH walk on every probe.
+# Falls back to PATH lookup at call time if not found.
+_PING_BIN = shutil.which("ping") or "ping"
+
+# Spacing between echoes on Linux (string, passed straight to ping -i).
+LINUX_PING_INTERVAL_S = "0.2"
 
 _UNKNOWN_HOST_PATTERNS = (
     "unknown host",
@@ -34,6 +41,52 @@ _UNKNOWN_HOST_PATTERNS = (
     "nodename nor servname provided",
 )
 
+_PERMISSION_PATTERNS = (
+    "permission denied",
+    "operation not permitted",
+)
+
+# One scan of the output finds both the time=12.3 ms / time<1ms samples and the
+# known failure messages; the group name says which one matched.
+# (bytes: ping output is matched undecoded, see run_ping)
+_PING_RE = re.compile(
+    (
+        r"time[=<]\s*(?P<time>[0-9]+(?:\.[0-9]+)?)\s*ms|(?P<unknown_host>%s)|(?P<permission>%s)"
+        % ("|".join(map(re.escape, _UNKNOWN_HOST_PATTERNS)), "|".join(map(re.escape, _PERMISSION_PATTERNS)))
+    ).encode("ascii"),
+    re.IGNORECASE,
+)
+
+
+def _latency_stats(latencies):
+    """
+    Single pass over non-empty samples -> (min, max, avg, jitter).
+    Jitter is the mean absolute difference of consecutive samples in original
+    order (0.0 for a single sample).
+    """
+    it = iter(latencies)
+    lo = hi = total = prev = next(it)
+    jitter_sum = 0.0
+    n = 1
+    for x in it:
+        if x < lo:
+            lo = x
+        elif x > hi:
+            hi = x
+        total += x
+        jitter_sum += abs(x - prev)
+        prev = x
+        n += 1
+    return lo, hi, total / n, (jitter_sum / (n - 1) if n > 1 else 0.0)
+
+
+def command_timeout(count, timeout):
+    """
+    Seconds run_ping lets the ping process run for count echoes with a
+    per-reply wait of timeout, before killing it and reporting a timeout.
+    """
+    return int(count) * (timeout + 1) + 3
+
 
 def run_ping(target, count=3, timeout=1.0):
     sent = int(count)
@@ -45,37 +98,44 @@ def run_ping(target, count=3, timeout=1.0):
 
     # Build a simple ping command depending on OS
     if system.startswith("win"):
-        cmd = ["ping", "-n", str(sent), "-w", str(int(timeout * 1000)), target]
-        # allow extra time for subprocess timeout
-        cmd_timeout = sent * (timeout + 1) + 3
+        cmd = [_PING_BIN, "-n", str(sent), "-w", str(int(timeout * 1000)), target]
+    elif system.startswith("linux"):
+        # one process sends all echoes: -n skips reverse lookups per reply and
+        # -i 0.2 (the unprivileged minimum) spaces them 200ms apart instead of 1s
+        # -W is whole seconds on iputils; round up so 0.5s doesn't become an invalid 0
+        cmd = [_PING_BIN, "-n", "-c", str(sent), "-i", LINUX_PING_INTERVAL_S, "-W", str(max(1, math.ceil(timeout))), target]
     else:
-        # macOS and Linux: use -c for count; let timeout be managed per-call where possible
-        cmd = ["ping", "-c", str(sent), target]
-        cmd_timeout = sent * (timeout + 1) + 3
+        # macOS: use -c for count; sub-second -i needs root there, so keep the default spacing
+        # macOS -W is per-reply wait in milliseconds
+        cmd = [_PING_BIN, "-n", "-c", str(sent), "-W", str(max(1, int(timeout * 1000))), target]
 
-    start = time.monotonic()
+    # allow extra time for subprocess timeout
+    cmd_timeout = command_timeout(sent, timeout)
+
+    start = time.perf_counter_ns()
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=cmd_timeout)
-        out = (proc.stdout or "") + "\n" + (proc.stderr or "")
-        low = out.lower()
-
-        # extract all time=xxx ms patterns
-        matches = _TIME_RE.findall(out)
-        for m in matches:
-            try:
-                latencies.append(float(m))
-            except Exception:
-                pass
-
-        # detect permission issues (common strings)
-        if "permission denied" in low or "operation not permitted" in low:
-            error_kind = PING_PERMISSION_DENIED
-            error = "ICMP permission denied for this process."
+        # Output stays bytes: the regexes below match it directly and only the
+        # error path needs text.
+        proc = subprocess.run(cmd, capture_output=True, timeout=cmd_timeout)
+        out = (proc.stdout or b"") + b"\n" + (proc.stderr or b"")
+
+        # time=xxx ms samples (only digits are captured, so float() can't fail)
+        # plus any known failure messages, in one pass
+        found = set()
+        for m in _PING_RE.finditer(out):
+            kind = m.lastgroup
+            if kind == "time":
+                latencies.append(float(m.group("time")))
+            else:
+                found.add(kind)
 
-        # detect unknown host / resolution errors
-        if any(p in low for p in _UNKNOWN_HOST_PATTERNS):
+        # unknown host wins over permission
+        if "unknown_host" in found:
             error_kind = PING_UNKNOWN_HOST
             error = "Ping failed: unknown host / name resolution error."
+        elif "permission" in found:
+            error_kind = PING_PERMISSION_DENIED
+            error = "ICMP permission denied for this process."
 
         received = len(latencies)
 
@@ -84,7 +144,8 @@ def run_ping(target, count=3, timeout=1.0):
             if proc.returncode != 0:
                 # if returncode non-zero but some output exists, mark failed
                 error_kind = PING_FAILED
-                error = (proc.stderr or proc.stdout or f"ping exited {proc.returncode}").strip()
+                raw = proc.stderr or proc.stdout
+                error = raw.decode("utf-8", "replace").strip() if raw else f"ping exited {proc.returncode}"
             else:
                 error_kind = PING_NO_REPLY
                 error = "No ping replies received."
@@ -102,21 +163,15 @@ def run_ping(target, count=3, timeout=1.0):
         error = str(e)
         received = 0
 
-    elapsed_ms = (time.monotonic() - start) * 1000.0
+    elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000.0
 
     # compute basic stats
     if latencies:
-        lat_sorted = sorted(latencies)
-        latency_min = lat_sorted[0]
-        latency_max = lat_sorted[-1]
-        latency_avg = sum(lat_sorted) / len(lat_sorted)
-        idx = int(0.95 * (len(lat_sorted) - 1))
-        latency_p95 = lat_sorted[idx]
-        # jitter: average absolute difference of consecutive samples (original order)
-        diffs = []
-        for i in range(1, len(latencies)):
-            diffs.append(abs(latencies[i] - latencies[i - 1]))
-        jitter = (sum(diffs) / len(diffs)) if diffs else 0.0
+        latency_min, latency_max, latency_avg, jitter = _latency_stats(latencies)
+        # p95 = sorted(latencies)[int(0.95 * (n - 1))], i.e. the k-th largest sample
+        n = len(latencies)
+        k = n - int(0.95 * (n - 1))
+        latency_p95 = heapq.nlargest(k, latencies)[-1]
     else:
         latency_min = latency_max = latency_avg = latency_p95 = jitter = None
 
@@ -1,11 +1,23 @@
 import csv
+import functools
+import sys
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 DATA_DIR = Path("data")
 
 
 def _read_csv_rows(path: Path) -> List[Dict[str, str]]:
+    return _read_csv_rows_cached(str(path))
+
+
+@functools.lru_cache(maxsize=32)
+def _read_csv_rows_cached(path_str: str) -> List[Dict[str, str]]:
+    """
+    Parsed rows per file, shared by the sections of one run(); callers must not mutate them.
+    """
+    path = Path(path_str)
     if not path.exists():
         return []
     with path.open("r", encoding="utf-8", newline="") as f:
@@ -13,6 +25,25 @@ def _read_csv_rows(path: Path) -> List[Dict[str, str]]:
         return [row for row in reader]
 
 
+def _iter_csv_cols(path: Path, cols: Sequence[str]) -> Iterator[Tuple[Optional[str], ...]]:
+    """
+    Yields only the requested columns of each row as a tuple (None for a column
+    the file doesn't have), without building a dict per row.
+    """
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        pos = {name: i for i, name in enumerate(header)}
+        idx = [pos.get(c) for c in cols]
+        for row in reader:
+            n = len(row)
+            yield tuple(row[i] if i is not None and i < n else None for i in idx)
+
+
 def _read_kv_csv(path: Path) -> Dict[str, str]:
     """
     Reads metric,value style csv into dict.
@@ -49,6 +80,9 @@ def _fmt_seconds(s: Optional[str]) -> str:
     return f"{v:.2f}s ({mins:.2f} min, {hours:.2f} h)"
 
 
+_first = itemgetter(0)
+
+
 def _pick_minmax(rows: List[Dict[str, str]], key: str) -> Tuple[Optional[Dict[str, str]], Optional[Dict[str, str]]]:
     """
     Returns (min_row, max_row) based on numeric key.
@@ -58,29 +92,43 @@ def _pick_minmax(rows: List[Dict[str, str]], key: str) -> Tuple[Optional[Dict[st
         v = _safe_float(r.get(key))
         if v is not None:
             vals.append((v, r))
+    return _minmax_by_value(vals)
+
+
+def _minmax_by_value(vals):
+    """
+    Returns (min_row, max_row) from (value, row) pairs.
+    """
     if not vals:
         return None, None
-    vals.sort(key=lambda x: x[0])
-    return vals[0][1], vals[-1][1]
+    # ties: first row for the min, last row for the max (as a stable sort gives)
+    return min(vals, key=_first)[1], max(reversed(vals), key=_first)[1]
 
 
-def _section(title: str) -> None:
-    print("\n" + "=" * 60)
-    print(title)
-    print("=" * 60)
+def _section(out: List[str], title: str) -> None:
+    out.append("\n" + "=" * 60)
+    out.append(title)
+    out.append("=" * 60)
 
 
-def report_baseline() -> None:
-    _section("Baseline report")
+def _emit(lines: List[str]) -> None:
+    # one write per report instead of one per line
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _baseline_lines() -> List[str]:
+    out: List[str] = []
+    _section(out, "Baseline report")
 
     bad_intervals = _read_csv_rows(DATA_DIR / "bad_intervals.csv")
     hourly_stats = _read_csv_rows(DATA_DIR / "hourly_stats.csv")
     total_downtime = _read_csv_rows(DATA_DIR / "total_downtime.csv")
 
     if not bad_intervals and not hourly_stats and not total_downtime:
-        print("No baseline analysis outputs found. Run:")
-        print("  python3 -m src.cli analyze baseline")
-        return
+        out.append("No baseline analysis outputs found. Run:")
+        out.append("  python3 -m src.cli analyze baseline")
+        return out
 
     # Hourly stats
     if hourly_stats:
@@ -97,17 +145,17 @@ def report_baseline() -> None:
                 f"n={r.get('num_probes')}"
             )
 
-        print("Hourly:")
-        print(f"  Best latency : {_fmt_hour_row(best_lat)}")
-        print(f"  Worst latency: {_fmt_hour_row(worst_lat)}")
-        print(f"  Best loss    : {_fmt_hour_row(best_loss)}")
-        print(f"  Worst loss   : {_fmt_hour_row(worst_loss)}")
+        out.append("Hourly:")
+        out.append(f"  Best latency : {_fmt_hour_row(best_lat)}")
+        out.append(f"  Worst latency: {_fmt_hour_row(worst_lat)}")
+        out.append(f"  Best loss    : {_fmt_hour_row(best_loss)}")
+        out.append(f"  Worst loss   : {_fmt_hour_row(worst_loss)}")
 
     # Top bad intervals
     if bad_intervals:
-        print("\nTop bad intervals (first 3):")
+        out.append("\nTop bad intervals (first 3):")
         for r in bad_intervals[:3]:
-            print(
+            out.append(
                 f"  {r.get('start_time')} → {r.get('end_time')} "
                 f"dur={r.get('duration_seconds')}s "
                 f"severity={r.get('severity')} reason={r.get('reason')} diagnosis={r.get('diagnosis')}"
@@ -124,78 +172,97 @@ def report_baseline() -> None:
         )
         td_str = _fmt_seconds(td)
         if td_str:
-            print(f"\nTotal downtime summary: {td_str}")
+            out.append(f"\nTotal downtime summary: {td_str}")
+    return out
 
 
-def report_wifi_diag() -> None:
-    _section("Wi-Fi diag report")
+def report_baseline() -> None:
+    _emit(_baseline_lines())
+
+
+def _wifi_diag_lines() -> List[str]:
+    out: List[str] = []
+    _section(out, "Wi-Fi diag report")
 
     summary_path = DATA_DIR / "wifi_diag_summary.csv"
     rows = _read_csv_rows(summary_path)
 
     if not rows:
-        print("No wifi-diag analysis outputs found. Run:")
-        print("  python3 -m src.cli analyze wifi-diag")
-        return
+        out.append("No wifi-diag analysis outputs found. Run:")
+        out.append("  python3 -m src.cli analyze wifi-diag")
+        return out
 
     r0 = rows[0]
-    print("Summary:")
+    out.append("Summary:")
     for k, v in r0.items():
         if v is None or str(v).strip() == "":
             continue
-        print(f"  {k}: {v}")
+        out.append(f"  {k}: {v}")
+    return out
 
 
-def report_service_health() -> None:
-    _section("Service health report")
+def report_wifi_diag() -> None:
+    _emit(_wifi_diag_lines())
+
+
+def _service_health_lines() -> List[str]:
+    out: List[str] = []
+    _section(out, "Service health report")
 
     summary = _read_kv_csv(DATA_DIR / "service_health_summary.csv")
     dist = _read_csv_rows(DATA_DIR / "service_health_state_distribution.csv")
     recent = _read_csv_rows(DATA_DIR / "service_health_recent.csv")
 
     if not summary and not dist and not recent:
-        print("No service-health analysis outputs found. Run:")
-        print("  python3 -m src.cli analyze service-health")
-        return
+        out.append("No service-health analysis outputs found. Run:")
+        out.append("  python3 -m src.cli analyze service-health")
+        return out
 
     if summary:
-        print("Summary:")
+        out.append("Summary:")
         for k in ["rows_total", "domains_unique", "healthy_pct", "blockedish_pct"]:
             if k in summary:
-                print(f"  {k}: {summary[k]}")
+                out.append(f"  {k}: {summary[k]}")
 
     if dist:
-        print("\nState distribution:")
+        out.append("\nState distribution:")
         for r in dist:
             state = r.get("service_state") or r.get("state") or r.get("metric") or ""
             pct = r.get("pct") or r.get("value") or r.get("count") or ""
             if state:
-                print(f"  {state}: {pct}")
+                out.append(f"  {state}: {pct}")
 
     if recent:
-        print("\nRecent (last 5):")
+        out.append("\nRecent (last 5):")
         for r in recent[:5]:
-            print(
+            out.append(
                 f"  {r.get('timestamp')} domain={r.get('service_name')} "
                 f"state={r.get('service_state')} code={r.get('http_status_code')}"
             )
+    return out
 
 
-def report_speedtest() -> None:
-    _section("Speedtest report")
+def report_service_health() -> None:
+    _emit(_service_health_lines())
+
+
+def _speedtest_lines() -> List[str]:
+    out: List[str] = []
+    _section(out, "Speedtest report")
 
     summary_rows = _read_csv_rows(DATA_DIR / "speedtest_summary.csv")
-    hourly_rows = _read_csv_rows(DATA_DIR / "speedtest_hourly.csv")
+    # only three columns of the hourly table are shown
+    hourly = list(_iter_csv_cols(DATA_DIR / "speedtest_hourly.csv", ("hour", "download_mbps_avg", "n")))
 
-    if not summary_rows and not hourly_rows:
-        print("No speedtest analysis outputs found. Run:")
-        print("  python3 -m src.cli speedtest")
-        print("  python3 -m src.cli analyze speedtest")
-        return
+    if not summary_rows and not hourly:
+        out.append("No speedtest analysis outputs found. Run:")
+        out.append("  python3 -m src.cli speedtest")
+        out.append("  python3 -m src.cli analyze speedtest")
+        return out
 
     if summary_rows:
         r = summary_rows[0]
-        print("Summary:")
+        out.append("Summary:")
         for k in [
             "total_runs",
             "ok_runs",
@@ -209,20 +276,31 @@ def report_speedtest() -> None:
             "upload_mbps_p90",
         ]:
             if k in r and str(r[k]).strip() != "":
-                print(f"  {k}: {r[k]}")
-
-    if hourly_rows:
-        # _pick_minmax returns (min, max). For download Mbps:
-        # best = max, worst = min
-        worst_dl, best_dl = _pick_minmax(hourly_rows, "download_mbps_avg")
+                out.append(f"  {k}: {r[k]}")
+
+    if hourly:
+        # (min, max) by download Mbps: best = max, worst = min
+        vals = []
+        for row in hourly:
+            v = _safe_float(row[1])
+            if v is not None:
+                vals.append((v, row))
+        worst_dl, best_dl = _minmax_by_value(vals)
         if best_dl and worst_dl:
-            print("\nHourly download:")
-            print(f"  Best : hour={best_dl.get('hour')} dl={best_dl.get('download_mbps_avg')} Mbps (n={best_dl.get('n')})")
-            print(f"  Worst: hour={worst_dl.get('hour')} dl={worst_dl.get('download_mbps_avg')} Mbps (n={worst_dl.get('n')})")
+            out.append("\nHourly download:")
+            out.append(f"  Best : hour={best_dl[0]} dl={best_dl[1]} Mbps (n={best_dl[2]})")
+            out.append(f"  Worst: hour={worst_dl[0]} dl={worst_dl[1]} Mbps (n={worst_dl[2]})")
+    return out
+
+
+def report_speedtest() -> None:
+    _emit(_speedtest_lines())
 
 
 def run(target: str = "all") -> None:
     t = (target or "all").strip().lower()
+    # pick up files rewritten by an analyze step since the last run
+    _read_csv_rows_cached.cache_clear()
 
     if t == "baseline":
         report_baseline()
@@ -237,10 +315,7 @@ def run(target: str = "all") -> None:
         report_speedtest()
         return
     if t == "all":
-        report_baseline()
-        report_wifi_diag()
-        report_service_health()
-        report_speedtest()
+        _emit(_baseline_lines() + _wifi_diag_lines() + _service_health_lines() + _speedtest_lines())
         return
 
     raise ValueError(f"Unknown report target: {target}")
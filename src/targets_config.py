@@ -6,8 +6,12 @@ Exposes:
 - WIFI_DIAG_EXTERNAL_HOST
 - WIFI_DIAG_EXTERNAL_URL
 - SERVICES (list)
+
+The JSON is read on first access, not at import.
 """
 
+import copy
+import functools
 import os
 import json
 
@@ -52,9 +56,38 @@ def _load_from_json(path=DEFAULT_CONFIG_PATH):
     return _default.copy()
 
 
-_cfg = _load_from_json()
+_CONFIG_NAMES = frozenset(_default)
+
+
+@functools.lru_cache(maxsize=1)
+def _loaded():
+    # parsed targets.json as on disk; never handed out, so it stays pristine
+    return _load_from_json()
+
+
+@functools.lru_cache(maxsize=1)
+def _cfg():
+    # backs the module attributes, which persist_gateway updates in place
+    return copy.deepcopy(_loaded())
+
+
+def get_services():
+    """
+    Fresh copy of the configured services on every call. In-place updates to
+    SERVICES (e.g. persist_gateway filling a gateway hostname) don't leak in,
+    so an empty gateway hostname is re-detected by each caller.
+    """
+    return copy.deepcopy(_loaded()["SERVICES"])
+
+
+def reload():
+    """Forget the cached config; the next access re-reads targets.json."""
+    _loaded.cache_clear()
+    _cfg.cache_clear()
+
 
-GATEWAY_HOSTNAME = _cfg["GATEWAY_HOSTNAME"]
-WIFI_DIAG_EXTERNAL_HOST = _cfg["WIFI_DIAG_EXTERNAL_HOST"]
-WIFI_DIAG_EXTERNAL_URL = _cfg["WIFI_DIAG_EXTERNAL_URL"]
-SERVICES = _cfg["SERVICES"]
+def __getattr__(name):
+    # module-level constants, resolved lazily from the cached config
+    if name in _CONFIG_NAMES:
+        return _cfg()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
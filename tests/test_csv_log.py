@@ -0,0 +1,55 @@
+import csv
+
+from src import csv_log
+
+
+def _row(i):
+    return csv_log.make_row(mode="test", round_id="r", service_name=f"svc{i}", probe_type="ping", success=True)
+
+
+def test_append_rows_writes_header_once(tmp_path):
+    path = str(tmp_path / "sub" / "log.csv")
+    csv_log.append_rows(path, [_row(1)])
+    csv_log.append_rows(path, [_row(2), _row(3)])
+
+    rows = list(csv.reader(open(path, newline="", encoding="utf-8")))
+    assert rows[0] == csv_log.CSV_HEADERS
+    assert len(rows) == 4
+
+
+def test_reset_csv_cache_rewrites_header_after_rotation(tmp_path):
+    path = str(tmp_path / "log.csv")
+    csv_log.append_rows(path, [_row(1)])
+
+    # simulate logrotate moving the file away
+    (tmp_path / "log.csv").rename(tmp_path / "log.csv.1")
+    csv_log.reset_csv_cache()
+    csv_log.append_rows(path, [_row(2)])
+
+    rows = list(csv.reader(open(path, newline="", encoding="utf-8")))
+    assert rows[0] == csv_log.CSV_HEADERS
+    assert len(rows) == 2
+
+
+def test_append_rows_column_order(tmp_path):
+    path = str(tmp_path / "log.csv")
+    csv_log.append_rows(path, [_row(1)])
+    csv_log.append_rows(path, [_row(2)])
+
+    rows = list(csv.DictReader(open(path, newline="", encoding="utf-8")))
+    assert [r["service_name"] for r in rows] == ["svc1", "svc2"]
+    assert rows[1]["success"] == "True"
+    assert rows[1]["probe_type"] == "ping"
+
+
+def test_append_rows_rewrites_header_after_delete_without_reset(tmp_path):
+    path = str(tmp_path / "log.csv")
+    csv_log.append_rows(path, [_row(1)])
+
+    # rotated/deleted without a SIGHUP: the path is still cached as ready
+    (tmp_path / "log.csv").unlink()
+    csv_log.append_rows(path, [_row(2)])
+
+    rows = list(csv.reader(open(path, newline="", encoding="utf-8")))
+    assert rows[0] == csv_log.CSV_HEADERS
+    assert len(rows) == 2
@@ -13,3 +13,24 @@ def test_dns_timeout(monkeypatch):
     monkeypatch.setattr("socket.gethostbyname", fake_gethostbyname)
     r = dns_check.run_dns("example.com", timeout=0.1)
     assert r["error_kind"] == DNS_TIMEOUT
+
+
+def test_dns_does_not_touch_default_timeout(monkeypatch):
+    monkeypatch.setattr("socket.gethostbyname", lambda h: "192.0.2.1")
+    before = socket.getdefaulttimeout()
+    r = dns_check.run_dns("example.com", timeout=1.5)
+    assert r["ok"] is True and r["ip"] == "192.0.2.1"
+    assert socket.getdefaulttimeout() == before
+
+
+def test_dns_slow_lookup_times_out(monkeypatch):
+    import threading
+
+    release = threading.Event()
+    monkeypatch.setattr("socket.gethostbyname", lambda h: release.wait(2) and "192.0.2.1")
+    try:
+        r = dns_check.run_dns("example.com", timeout=0.05)
+    finally:
+        release.set()
+    assert r["error_kind"] == DNS_TIMEOUT
+    assert r["dns_ms"] < 1000
@@ -0,0 +1,58 @@
+import socket
+
+from src import dns_cache
+
+
+def _fake_getaddrinfo(answers, calls):
+    def fake(host, port, family=0, type=0, *args):
+        calls.append(host)
+        if host not in answers:
+            raise socket.gaierror(-2, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (answers[host], 0))]
+    return fake
+
+
+def test_resolve_caches_until_invalidated(monkeypatch):
+    dns_cache.invalidate()
+    calls = []
+    monkeypatch.setattr(dns_cache.socket, "getaddrinfo", _fake_getaddrinfo({"a.test": "10.0.0.1"}, calls))
+
+    assert dns_cache.resolve("a.test") == "10.0.0.1"
+    assert dns_cache.resolve("a.test") == "10.0.0.1"
+    assert calls == ["a.test"]
+
+    dns_cache.invalidate("a.test")
+    assert dns_cache.resolve("a.test") == "10.0.0.1"
+    assert calls == ["a.test", "a.test"]
+
+
+def test_resolve_expires_and_does_not_cache_failures(monkeypatch):
+    dns_cache.invalidate()
+    calls = []
+    monkeypatch.setattr(dns_cache.socket, "getaddrinfo", _fake_getaddrinfo({"a.test": "10.0.0.1"}, calls))
+
+    assert dns_cache.resolve("a.test", ttl=0) == "10.0.0.1"
+    assert dns_cache.resolve("a.test", ttl=0) == "10.0.0.1"
+    assert dns_cache.resolve("missing.test") is None
+    assert dns_cache.resolve("missing.test") is None
+    assert calls == ["a.test", "a.test", "missing.test", "missing.test"]
+
+
+def test_resolve_gives_up_on_stalled_resolver(monkeypatch):
+    import threading
+    import time
+
+    dns_cache.invalidate()
+    release = threading.Event()
+
+    def stalled(*a, **k):
+        release.wait(2)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 0))]
+
+    monkeypatch.setattr(dns_cache.socket, "getaddrinfo", stalled)
+    start = time.monotonic()
+    try:
+        assert dns_cache.resolve("slow.test", timeout=0.05) is None
+    finally:
+        release.set()
+    assert time.monotonic() - start < 1.0
@@ -9,7 +9,7 @@ def test_http_ssl_error(monkeypatch):
     def fake_get(*a, **k):
         raise requests.exceptions.SSLError("SSL fail")
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
     r = http_check.run_http("https://example.com", timeout=0.1)
     assert r["error_kind"] == HTTP_SSL
 
@@ -18,6 +18,68 @@ def test_http_connection_error(monkeypatch):
     def fake_get(*a, **k):
         raise requests.exceptions.ConnectionError("conn fail")
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
     r = http_check.run_http("https://example.com", timeout=0.1)
     assert r["error_kind"] == HTTP_CONN_ERROR
+
+
+def test_http_uses_given_session(monkeypatch):
+    class FakeResp:
+        status_code = 204
+        content = b""
+        history = []
+
+    class FakeSession:
+        calls = 0
+
+        def get(self, url, timeout=None):
+            FakeSession.calls += 1
+            return FakeResp()
+
+    def fail_get(*a, **k):
+        raise AssertionError("the shared session should not be used when a session is given")
+
+    monkeypatch.setattr(requests.Session, "get", fail_get)
+    r = http_check.run_http("https://example.com", timeout=0.1, session=FakeSession())
+    assert r["ok"] is True
+    assert FakeSession.calls == 1
+
+
+def test_http_reuses_shared_session(monkeypatch):
+    class FakeResp:
+        status_code = 200
+        content = b"ok"
+        history = []
+
+    seen = []
+
+    def fake_get(self, url, timeout=None):
+        seen.append(self)
+        return FakeResp()
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    http_check.run_http("https://a.example", timeout=0.1)
+    http_check.run_http("https://b.example", timeout=0.1)
+
+    assert len(seen) == 2
+    assert seen[0] is seen[1] is http_check._shared_session()
+    assert seen[0].get_adapter("https://a.example")._pool_maxsize == http_check.POOL_PER_HOST
+
+
+def test_http_fresh_connection_skips_pool(monkeypatch):
+    class FakeResp:
+        status_code = 200
+        content = b"ok"
+        history = []
+
+    cold = []
+
+    def pooled_get(self, url, timeout=None):
+        raise AssertionError("fresh_connection must not use the pooled session")
+
+    monkeypatch.setattr(requests.Session, "get", pooled_get)
+    monkeypatch.setattr(requests, "get", lambda url, timeout=None: cold.append(url) or FakeResp())
+
+    r = http_check.run_http("https://a.example", timeout=0.1, fresh_connection=True)
+    assert r["ok"] is True
+    assert cold == ["https://a.example"]
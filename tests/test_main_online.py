@@ -1,9 +1,21 @@
 import csv
 from pathlib import Path
 
+import pytest
+
 from src import main, csv_log
 
 
+@pytest.fixture(autouse=True)
+def _no_resolver(monkeypatch):
+    # keep run_once off the host resolver and start every test with an empty cache
+    clear = main.dns_cache.invalidate
+    clear()
+    monkeypatch.setattr(main.dns_cache, "resolve", lambda host: None)
+    yield
+    clear()
+
+
 def test_run_once_writes_expected_number_of_rows(tmp_path, monkeypatch):
     # Two services: svc1 has ping,dns,http -> 3 rows; svc2 has ping,dns -> 2 rows. Total = 5
     services = [
@@ -60,3 +72,111 @@ def test_run_once_writes_expected_number_of_rows(tmp_path, monkeypatch):
     # verify each row has a JSON-like details field
     for r in rows:
         assert "details" in r
+
+
+def test_run_once_probes_services_concurrently_and_keeps_order(tmp_path, monkeypatch):
+    import threading
+
+    services = [
+        {"name": f"svc{i}", "hostname": f"host{i}.test", "tags": [], "ping": {"enabled": True}}
+        for i in range(4)
+    ]
+    barrier = threading.Barrier(len(services), timeout=2.0)
+
+    def fake_ping(host, count=3, timeout=1.0):
+        # every service must be in flight at once for the barrier to release
+        barrier.wait()
+        return {"sent": 1, "received": 1, "latencies_ms": [1.0], "packet_loss_pct": 0.0,
+                "error": None, "error_kind": "ok"}
+
+    monkeypatch.setattr(main.ping_check, "run_ping", fake_ping)
+
+    log_file = tmp_path / "netinsight_log.csv"
+    summary = main.run_once(round_id="r", services=services, log_path=str(log_file))
+
+    assert summary["failures"] == 0
+    rows = list(csv.DictReader(open(log_file, newline="", encoding="utf-8")))
+    assert [r["service_name"] for r in rows] == [s["name"] for s in services]
+
+
+def test_run_once_pings_cached_address_and_keeps_hostname(tmp_path, monkeypatch):
+    services = [{"name": "svc", "hostname": "host.test", "tags": [], "ping": {"enabled": True}}]
+    pinged = []
+    invalidated = []
+    kinds = iter(["ping_no_reply", "ping_unknown_host"])
+
+    def fake_ping(host, count=3, timeout=1.0):
+        pinged.append(host)
+        return {"sent": 1, "received": 0, "latencies_ms": [], "packet_loss_pct": 100.0,
+                "error": "failed", "error_kind": next(kinds)}
+
+    monkeypatch.setattr(main.dns_cache, "resolve", lambda host: "192.0.2.7")
+    monkeypatch.setattr(main.dns_cache, "invalidate", invalidated.append)
+    monkeypatch.setattr(main.ping_check, "run_ping", fake_ping)
+
+    log_file = tmp_path / "netinsight_log.csv"
+    # ICMP-filtered host: no replies, but the cached address stays
+    main.run_once(round_id="r1", services=services, log_path=str(log_file))
+    assert invalidated == []
+
+    # only a name-resolution failure drops it
+    main.run_once(round_id="r2", services=services, log_path=str(log_file))
+    assert invalidated == ["host.test"]
+
+    rows = list(csv.DictReader(open(log_file, newline="", encoding="utf-8")))
+    assert pinged == ["192.0.2.7", "192.0.2.7"]
+    assert rows[0]["hostname"] == "host.test"
+
+
+def test_sighup_handler_keeps_default_hangup(monkeypatch):
+    import signal
+
+    if not hasattr(signal, "SIGHUP"):
+        return
+    installed = []
+    monkeypatch.setattr(main.signal, "signal", lambda sig, handler: installed.append(sig))
+
+    monkeypatch.setattr(main.signal, "getsignal", lambda sig: signal.SIG_DFL)
+    main._install_sighup_handler()
+    assert installed == []
+
+    # under nohup SIGHUP is ignored, so reloading on it is safe
+    monkeypatch.setattr(main.signal, "getsignal", lambda sig: signal.SIG_IGN)
+    main._install_sighup_handler()
+    assert installed == [signal.SIGHUP]
+
+
+def test_run_once_redetects_gateway_after_persist(tmp_path, monkeypatch):
+    import json
+
+    cfg = {"GATEWAY_HOSTNAME": None, "SERVICES": [
+        {"name": "gateway", "hostname": "", "tags": ["gateway"], "ping": {"enabled": True}},
+    ]}
+    cfg_path = tmp_path / "targets.json"
+    cfg_path.write_text(json.dumps(cfg), encoding="utf-8")
+
+    tc = main.targets_config
+    load = tc._load_from_json
+    monkeypatch.setattr(tc, "_load_from_json", lambda: load(str(cfg_path)))
+    tc.reload()
+
+    gateway = {"ip": "192.0.2.1"}
+    pinged = []
+    monkeypatch.setattr(main.net_utils, "get_default_gateway_ip", lambda: gateway["ip"])
+    monkeypatch.setattr(main.ping_check, "run_ping", lambda host, count=3, timeout=1.0: pinged.append(host) or {
+        "sent": 1, "received": 1, "latencies_ms": [1.0], "packet_loss_pct": 0.0, "error": None, "error_kind": "ok"})
+
+    try:
+        # startup: detected gateway is filled into the in-memory config
+        assert main.persist_gateway(gateway["ip"], targets_file_path=str(cfg_path), targets_module=tc)
+        log_path = str(tmp_path / "log.csv")
+        main.run_once(round_id="r1", log_path=log_path)
+
+        # the network changes; the next round must follow it
+        gateway["ip"] = "192.0.2.254"
+        main.run_once(round_id="r2", log_path=log_path)
+    finally:
+        monkeypatch.undo()
+        tc.reload()
+
+    assert pinged == ["192.0.2.1", "192.0.2.254"]
@@ -0,0 +1,185 @@
+from src import net_utils
+
+
+def test_gateway_cached_until_invalidated(monkeypatch):
+    monkeypatch.delenv("NETINSIGHT_GATEWAY_IP", raising=False)
+    net_utils.invalidate_gateway_cache()
+    calls = []
+
+    def fake_detect():
+        calls.append(1)
+        return "192.0.2.1"
+
+    monkeypatch.setattr(net_utils, "_detect_default_gateway_ip", fake_detect)
+    assert net_utils.get_default_gateway_ip() == "192.0.2.1"
+    assert net_utils.get_default_gateway_ip() == "192.0.2.1"
+    assert len(calls) == 1
+
+    net_utils.invalidate_gateway_cache()
+    net_utils.get_default_gateway_ip()
+    assert len(calls) == 2
+    net_utils.invalidate_gateway_cache()
+
+
+def test_gateway_miss_not_cached_and_env_wins(monkeypatch):
+    monkeypatch.delenv("NETINSIGHT_GATEWAY_IP", raising=False)
+    net_utils.invalidate_gateway_cache()
+    calls = []
+    monkeypatch.setattr(net_utils, "_detect_default_gateway_ip", lambda: calls.append(1))
+    assert net_utils.get_default_gateway_ip() is None
+    assert net_utils.get_default_gateway_ip() is None
+    assert len(calls) == 2
+
+    monkeypatch.setenv("NETINSIGHT_GATEWAY_IP", " 10.0.0.1 ")
+    assert net_utils.get_default_gateway_ip() == "10.0.0.1"
+
+
+def test_parse_proc_net_route(monkeypatch, tmp_path):
+    route = tmp_path / "route"
+    route.write_text(
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+        "eth0\t0002A8C0\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n"
+        "eth0\t00000000\t0102A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+    )
+    monkeypatch.setattr(net_utils, "_PROC_NET_ROUTE", str(route))
+    assert net_utils._parse_proc_net_route() == "192.168.2.1"
+
+
+def test_is_wsl_detects_marker(monkeypatch):
+    files = {"/proc/version": b"Linux version 5.15.90.1-Microsoft-standard-WSL2 (gcc)"}
+    monkeypatch.setattr(net_utils, "_read_small_file", lambda p: files.get(p))
+    net_utils._is_wsl.cache_clear()
+    try:
+        assert net_utils._is_wsl() is True
+        files.clear()
+        # memoized for the life of the process
+        assert net_utils._is_wsl() is True
+        net_utils._is_wsl.cache_clear()
+        assert net_utils._is_wsl() is False
+    finally:
+        net_utils._is_wsl.cache_clear()
+
+
+def test_local_address_present_from_fib_trie(monkeypatch, tmp_path):
+    trie = tmp_path / "fib_trie"
+    trie.write_bytes(
+        b"Local:\n"
+        b"  +-- 127.0.0.0/8 2 0 2\n"
+        b"     |-- 127.0.0.1\n"
+        b"        /32 host LOCAL\n"
+        b"     |-- 127.0.1.1\n"
+        b"        /32 host LOCAL\n"
+        b"     |-- 127.255.255.255\n"
+        b"        /32 link BROADCAST\n"
+    )
+    monkeypatch.setattr(net_utils, "_PROC_FIB_TRIE", str(trie))
+    assert net_utils._local_address_present("127.0.1.1") is True
+    assert net_utils._local_address_present("127.0.0.2") is False
+    assert net_utils._local_address_present("127.255.255.255") is False
+
+    monkeypatch.setattr(net_utils, "_PROC_FIB_TRIE", str(tmp_path / "missing"))
+    assert net_utils._local_address_present("127.0.0.1") is None
+
+
+def test_loopback_candidate_from_etc_hosts(monkeypatch, tmp_path):
+    hosts = tmp_path / "hosts"
+    hosts.write_bytes(b"# 127.0.1.1 commented\n127.0.0.1\tlocalhost\n  127.0.1.1 box.localdomain box\n")
+    monkeypatch.setattr(net_utils, "_ETC_HOSTS", str(hosts))
+    monkeypatch.setattr(net_utils, "_local_address_present", lambda addr: False)
+    assert net_utils._loopback_candidate_present("127.0.1.1") is True
+    assert net_utils._loopback_candidate_present("127.0.0.2") is False
+
+    hosts.write_bytes(b"# 127.0.1.1 commented\n127.0.1.10 other\n")
+    assert net_utils._loopback_candidate_present("127.0.1.1") is False
+
+
+def test_command_timeout_falls_through(monkeypatch):
+    import subprocess
+
+    def hung(cmd, **kwargs):
+        assert kwargs.get("timeout") == net_utils._CMD_TIMEOUT_S
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    monkeypatch.setattr(subprocess, "check_output", hung)
+    assert net_utils._parse_ip_route_get_via() is None
+    assert net_utils._parse_route_n() is None
+
+
+def _rtnl_route(dst_len, gateway=None, metric=None, table=254):
+    import socket
+    import struct
+
+    attrs = b""
+    if gateway:
+        attrs += struct.pack("=HH", 8, 5) + socket.inet_aton(gateway)
+    if metric is not None:
+        attrs += struct.pack("=HH", 8, 6) + struct.pack("=I", metric)
+    rtm = struct.pack("=BBBBBBBBI", socket.AF_INET, dst_len, 0, 0, table, 3, 0, 1, 0)
+    return struct.pack("=LHHLL", 16 + len(rtm) + len(attrs), 24, 2, 1, 0) + rtm + attrs
+
+
+def test_parse_rtnl_default_routes():
+    import struct
+
+    data = (
+        _rtnl_route(24)  # connected subnet, no gateway
+        + _rtnl_route(0, "192.0.2.1", metric=600)
+        + _rtnl_route(0, "198.51.100.1", metric=100)
+        + _rtnl_route(0, "203.0.113.1", table=255)  # not the main table
+        + struct.pack("=LHHLL", 20, 3, 2, 1, 0) + b"\0\0\0\0"
+    )
+    routes, done = net_utils._parse_rtnl_default_routes(data)
+    assert done is True
+    assert sorted(routes) == [(100, "198.51.100.1"), (600, "192.0.2.1")]
+
+
+def test_is_ipv4():
+    assert net_utils._is_ipv4("192.168.1.1")
+    assert not net_utils._is_ipv4("0.0.0.0")
+    assert not net_utils._is_ipv4("1.2.3.4.5")
+    assert not net_utils._is_ipv4("1.2.3")
+    assert not net_utils._is_ipv4("a.b.c.d")
+    assert not net_utils._is_ipv4("256.1.1.1")
+
+
+def test_route_text_parsers(monkeypatch):
+    outputs = {
+        ("ip", "route", "get", "1.1.1.1"): "1.1.1.1 via 192.168.240.1 dev eth0 src 192.168.246.72 uid 1000\n    cache\n",
+        ("ip", "route", "show", "default"): "default via 10.0.0.1 dev wlan0 proto dhcp metric 600\n",
+        ("route", "get", "default"): "   route to: default\ndestination: default\n    gateway: 172.16.0.1\n  interface: en0\n",
+    }
+    monkeypatch.setattr(net_utils, "_run", lambda cmd: outputs[tuple(cmd)])
+    assert net_utils._parse_ip_route_get_via() == "192.168.240.1"
+    assert net_utils._parse_ip_route_default() == "10.0.0.1"
+    assert net_utils._parse_darwin_route_get_default() == "172.16.0.1"
+
+    outputs[("ip", "route", "get", "1.1.1.1")] = "1.1.1.1 dev eth0 src 10.0.0.5 uid 0\n"
+    outputs[("ip", "route", "show", "default")] = "default dev ppp0 scope link\n"
+    assert net_utils._parse_ip_route_get_via() is None
+    assert net_utils._parse_ip_route_default() is None
+
+
+def test_text_route_fallbacks_keep_priority(monkeypatch):
+    import time
+
+    def slow_first():
+        time.sleep(0.1)
+        return "192.0.2.10"
+
+    monkeypatch.setattr(
+        net_utils,
+        "_TEXT_ROUTE_FALLBACKS",
+        (("first", slow_first), ("second", lambda: "192.0.2.20"), ("third", lambda: None)),
+    )
+    # the faster lower-priority answer must not win
+    assert net_utils._first_text_route_gateway() == "192.0.2.10"
+
+    def boom():
+        raise RuntimeError("no ip binary")
+
+    monkeypatch.setattr(
+        net_utils,
+        "_TEXT_ROUTE_FALLBACKS",
+        (("first", boom), ("second", lambda: None), ("third", lambda: "192.0.2.30")),
+    )
+    assert net_utils._first_text_route_gateway() == "192.0.2.30"
@@ -8,7 +8,8 @@ from src.error_kinds import PING_PERMISSION_DENIED
 
 
 def _fake_completed(stdout="", stderr="", returncode=0):
-    return SimpleNamespace(stdout=stdout, stderr=stderr, returncode=returncode)
+    # run_ping reads raw bytes from the subprocess (no text=True)
+    return SimpleNamespace(stdout=stdout.encode(), stderr=stderr.encode(), returncode=returncode)
 
 
 def test_ping_permission_denied(monkeypatch):
@@ -30,3 +31,65 @@ def test_ping_p95_and_jitter(monkeypatch):
     assert r["latency_p95_ms"] == 20.0
     # jitter: mean absolute difference of consecutive samples in original order (10 and 10 => average 10)
     assert r["jitter_ms"] == 10.0
+
+
+@pytest.mark.parametrize("out", ["time=10.0 ms\ntime=12.5 ms\n", "Request timeout for icmp_seq 0\n"])
+def test_ping_numeric_fields_are_float_or_none(monkeypatch, out):
+    # wifi_diag filters samples with `is not None`; this pins that invariant.
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: _fake_completed(stdout=out, stderr="", returncode=0))
+    r = ping_check.run_ping("example.com", count=2, timeout=1.0)
+    for key in ("latency_min_ms", "latency_max_ms", "latency_avg_ms", "latency_p95_ms", "jitter_ms"):
+        assert r[key] is None or isinstance(r[key], float)
+    assert isinstance(r["packet_loss_pct"], float)
+
+
+def test_latency_stats_single_pass():
+    assert ping_check._latency_stats([10.0, 30.0, 20.0]) == (10.0, 30.0, 20.0, 15.0)
+    assert ping_check._latency_stats([5.0]) == (5.0, 5.0, 5.0, 0.0)
+
+
+def test_ping_unknown_host_wins_over_permission(monkeypatch):
+    from src.error_kinds import PING_UNKNOWN_HOST
+
+    err = "ping: socket: Operation not permitted\nping: nosuch.invalid: Name or service not known"
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: _fake_completed(stdout="", stderr=err, returncode=2))
+    r = ping_check.run_ping("nosuch.invalid", count=1, timeout=1.0)
+    assert r["error_kind"] == PING_UNKNOWN_HOST
+
+
+def test_ping_failed_message_decoded(monkeypatch):
+    from src.error_kinds import PING_FAILED
+
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: _fake_completed(stdout="", stderr="ping: bad option\n", returncode=2))
+    r = ping_check.run_ping("example.com", count=1, timeout=1.0)
+    assert r["error_kind"] == PING_FAILED
+    assert r["error"] == "ping: bad option"
+
+
+def test_ping_linux_reply_wait_rounded_up(monkeypatch):
+    seen = {}
+
+    def fake_run(cmd, **kwargs):
+        seen["cmd"] = cmd
+        seen["timeout"] = kwargs.get("timeout")
+        return _fake_completed(stdout="time=1.0 ms\n")
+
+    monkeypatch.setattr(ping_check.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    ping_check.run_ping("example.com", count=2, timeout=0.5)
+    cmd = seen["cmd"]
+    assert cmd[cmd.index("-W") + 1] == "1"
+    assert seen["timeout"] is not None
+
+
+def test_ping_process_timeout_matches_command_timeout(monkeypatch):
+    seen = []
+
+    def fake_run(cmd, **kwargs):
+        seen.append(kwargs.get("timeout"))
+        return _fake_completed(stdout="time=1.0 ms\n")
+
+    monkeypatch.setattr(ping_check.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    ping_check.run_ping("example.com", count=2, timeout=1.5)
+    assert seen == [ping_check.command_timeout(2, 1.5)] == [8.0]
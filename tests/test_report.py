@@ -0,0 +1,63 @@
+from src import report
+
+
+def test_pick_minmax_skips_non_numeric():
+    rows = [
+        {"hour": "0", "v": "5.0"},
+        {"hour": "1", "v": ""},
+        {"hour": "2", "v": "1.5"},
+        {"hour": "3", "v": "n/a"},
+        {"hour": "4", "v": "9"},
+    ]
+    lo, hi = report._pick_minmax(rows, "v")
+    assert lo["hour"] == "2"
+    assert hi["hour"] == "4"
+
+
+def test_pick_minmax_empty():
+    assert report._pick_minmax([{"v": ""}], "v") == (None, None)
+
+
+def test_iter_csv_cols_missing_column_is_none(tmp_path):
+    path = tmp_path / "t.csv"
+    path.write_text("hour,download_mbps_avg,extra\n0,50.5,x\n1,,y\n", encoding="utf-8")
+    assert list(report._iter_csv_cols(path, ("hour", "download_mbps_avg", "n"))) == [
+        ("0", "50.5", None),
+        ("1", "", None),
+    ]
+    assert list(report._iter_csv_cols(tmp_path / "missing.csv", ("hour",))) == []
+
+
+def test_report_speedtest_hourly_best_worst(tmp_path, monkeypatch, capsys):
+    (tmp_path / "speedtest_hourly.csv").write_text(
+        "hour,download_mbps_avg,upload_mbps_avg,n\n0,80,10,3\n1,20,5,2\n2,,1,1\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(report, "DATA_DIR", tmp_path)
+    report.report_speedtest()
+    out = capsys.readouterr().out
+    assert "Best : hour=0 dl=80 Mbps (n=3)" in out
+    assert "Worst: hour=1 dl=20 Mbps (n=2)" in out
+
+
+def test_run_rereads_files_between_runs(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(report, "DATA_DIR", tmp_path)
+    summary = tmp_path / "wifi_diag_summary.csv"
+    summary.write_text("diagnosis\nfirst\n", encoding="utf-8")
+    report.run("wifi-diag")
+    summary.write_text("diagnosis\nsecond\n", encoding="utf-8")
+    report.run("wifi-diag")
+    out = capsys.readouterr().out
+    assert "diagnosis: first" in out
+    assert "diagnosis: second" in out
+
+
+def test_pick_minmax_tie_break():
+    rows = [
+        {"hour": "0", "v": "1"},
+        {"hour": "1", "v": "9"},
+        {"hour": "2", "v": "1"},
+        {"hour": "3", "v": "9"},
+    ]
+    lo, hi = report._pick_minmax(rows, "v")
+    assert lo["hour"] == "0"
+    assert hi["hour"] == "3"
@@ -71,3 +71,70 @@ def test_http_missing_ping_nonzero():
     dns_r = {"ok": True}
     http_r = None
     assert classify_service_state(ping_r, dns_r, http_r) == "inconclusive"
+
+
+def test_run_service_health_parallel_probes(monkeypatch, tmp_path):
+    from src import mode_service_health as sh
+
+    monkeypatch.setattr(sh.ping_check, "run_ping", lambda host, count=2, timeout=1.0: {"received": 2})
+    monkeypatch.setattr(sh.dns_check, "run_dns", lambda host, timeout=1.0: {"ok": True, "ip": "1.2.3.4"})
+
+    def boom(url, timeout=1.0, session=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(sh.http_check, "run_http", boom)
+    rows = []
+    monkeypatch.setattr(sh, "append_rows", lambda path, r: rows.extend(r))
+
+    state = sh.run_service_health("example.com", log_path=str(tmp_path / "sh.csv"))
+    assert state == "inconclusive"
+    assert rows[0]["error_message"] == "boom"
+
+
+def test_run_service_health_deadline(monkeypatch, tmp_path):
+    import threading
+
+    from src import mode_service_health as sh
+
+    release = threading.Event()
+    monkeypatch.setattr(sh, "PROBE_DEADLINE_S", 0.05)
+    monkeypatch.setattr(sh.ping_check, "run_ping", lambda host, count=2, timeout=1.0: {"received": 2})
+    monkeypatch.setattr(sh.dns_check, "run_dns", lambda host, timeout=1.0: {"ok": True, "ip": "1.2.3.4"})
+    monkeypatch.setattr(sh.http_check, "run_http", lambda url, timeout=1.0, session=None: release.wait(2) or {"ok": True})
+    monkeypatch.setattr(sh, "append_rows", lambda path, r: None)
+
+    try:
+        state = sh.run_service_health("example.com", log_path=str(tmp_path / "sh.csv"))
+    finally:
+        release.set()
+    assert state == "connection_issue_or_blocked"
+
+
+def test_probe_timeouts_fit_inside_deadline(monkeypatch, tmp_path):
+    from src import mode_service_health as sh
+
+    seen = {}
+
+    def fake_ping(host, count=2, timeout=1.0):
+        seen["ping"] = sh.ping_check.command_timeout(count, timeout)
+        return {"received": 2}
+
+    def fake_dns(host, timeout=1.0):
+        seen["dns"] = timeout
+        return {"ok": True, "ip": "1.2.3.4"}
+
+    def fake_http(url, timeout=1.0, session=None):
+        seen["http_timeout"] = timeout
+        # connect + read
+        seen["http"] = 2 * timeout
+        return {"ok": True}
+
+    monkeypatch.setattr(sh.ping_check, "run_ping", fake_ping)
+    monkeypatch.setattr(sh.dns_check, "run_dns", fake_dns)
+    monkeypatch.setattr(sh.http_check, "run_http", fake_http)
+    monkeypatch.setattr(sh, "append_rows", lambda path, r: None)
+
+    assert sh.run_service_health("example.com", log_path=str(tmp_path / "sh.csv")) == "healthy"
+    # a site answering within 5s is still given the full 5s
+    assert seen.pop("http_timeout") == 5.0
+    assert all(v < sh.PROBE_DEADLINE_S for v in seen.values())
@@ -0,0 +1,72 @@
+import json
+import shutil
+import importlib.util
+
+
+def _fresh_module(tmp_path):
+    src_copy = tmp_path / "targets_config.py"
+    shutil.copy2("src/targets_config.py", str(src_copy))
+    spec = importlib.util.spec_from_file_location("lazy_targets_config", str(src_copy))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def test_config_is_read_once_on_first_access(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "targets.json"
+    cfg_path.write_text(json.dumps({"WIFI_DIAG_EXTERNAL_HOST": "example.test", "SERVICES": [{"name": "x"}]}))
+
+    mod = _fresh_module(tmp_path)
+    loads = []
+    load = mod._load_from_json
+    monkeypatch.setattr(mod, "_load_from_json", lambda: loads.append(1) or load(str(cfg_path)))
+
+    # importing alone does not touch the JSON
+    assert loads == []
+
+    assert mod.WIFI_DIAG_EXTERNAL_HOST == "example.test"
+    assert mod.SERVICES == [{"name": "x"}]
+    assert mod.get_services() == mod.SERVICES
+    assert loads == [1]
+
+
+def test_unknown_attribute_raises(tmp_path):
+    mod = _fresh_module(tmp_path)
+    try:
+        mod.NOT_A_SETTING
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
+
+
+def test_reload_rereads_json(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "targets.json"
+    cfg_path.write_text(json.dumps({"SERVICES": [{"name": "a"}]}))
+
+    mod = _fresh_module(tmp_path)
+    load = mod._load_from_json
+    monkeypatch.setattr(mod, "_load_from_json", lambda: load(str(cfg_path)))
+
+    assert [s["name"] for s in mod.get_services()] == ["a"]
+    cfg_path.write_text(json.dumps({"SERVICES": [{"name": "b"}]}))
+    assert [s["name"] for s in mod.get_services()] == ["a"]
+
+    mod.reload()
+    assert [s["name"] for s in mod.get_services()] == ["b"]
+
+
+def test_get_services_unaffected_by_in_place_updates(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "targets.json"
+    cfg_path.write_text(json.dumps({"SERVICES": [{"name": "gateway", "hostname": "", "tags": ["gateway"]}]}))
+
+    mod = _fresh_module(tmp_path)
+    load = mod._load_from_json
+    monkeypatch.setattr(mod, "_load_from_json", lambda: load(str(cfg_path)))
+
+    # what persist_gateway does to the module attribute
+    mod.SERVICES[0]["hostname"] = "192.0.2.1"
+
+    assert mod.get_services()[0]["hostname"] == ""
+    mod.get_services()[0]["hostname"] = "x"
+    assert mod.get_services()[0]["hostname"] == ""
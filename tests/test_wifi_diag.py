@@ -32,3 +32,45 @@ def test_wifi_diag_detects_isp_when_external_large(monkeypatch):
     monkeypatch.setattr(mode_wifi_diag, "append_rows", lambda path, rows: setattr(mode_wifi_diag, "_last_rows", rows))
     diag = mode_wifi_diag.run_wifi_diag(rounds=3, interval=0, gateway_host="gw", external_host="ex", log_path=":memory:")
     assert "ISP" in diag or "upstream" in diag
+
+def test_wifi_diag_flushes_rows_in_batches(monkeypatch):
+    monkeypatch.setattr(mode_wifi_diag.ping_check, "run_ping", lambda host, count=1, timeout=1.0: _mk_resp(1, 10.0))
+    monkeypatch.setattr(mode_wifi_diag, "FLUSH_EVERY_ROWS", 4)
+    batches = []
+    monkeypatch.setattr(mode_wifi_diag, "append_rows", lambda path, rows: batches.append(len(rows)))
+    mode_wifi_diag.run_wifi_diag(rounds=5, interval=0, gateway_host="gw", external_host="ex", log_path=":memory:")
+    # two rows per round: flushed after rounds 2 and 4, remainder at the end
+    assert batches == [4, 4, 2]
+
+def test_wifi_diag_round_rows_share_timestamp(monkeypatch):
+    monkeypatch.setattr(mode_wifi_diag.ping_check, "run_ping", lambda host, count=1, timeout=1.0: _mk_resp(1, 10.0))
+    captured = []
+    monkeypatch.setattr(mode_wifi_diag, "append_rows", lambda path, rows: captured.extend(rows))
+    mode_wifi_diag.run_wifi_diag(rounds=2, interval=0, gateway_host="gw", external_host="ex", log_path=":memory:")
+    assert len(captured) == 4
+    assert captured[0]["timestamp"] == captured[1]["timestamp"]
+    assert captured[2]["timestamp"] == captured[3]["timestamp"]
+
+def test_wifi_diag_main_detects_gateway_once(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_detect():
+        calls.append(1)
+        return None
+
+    monkeypatch.setattr(net_utils, "get_default_gateway_ip", fake_detect)
+    monkeypatch.setattr(mode_wifi_diag.ping_check, "run_ping", lambda host, count=1, timeout=1.0: _mk_resp(1, 10.0))
+    monkeypatch.setattr(mode_wifi_diag, "append_rows", lambda path, rows: None)
+    mode_wifi_diag.main(["--rounds", "1", "--interval", "0", "--log-path", str(tmp_path / "w.csv")])
+    assert len(calls) == 1
+
+def test_wifi_diag_zero_external_latency_is_wifi_congestion(monkeypatch):
+    # "time<1ms" parses as 0.0; the ratio check must not divide by it
+    def fake_ping(host, count=1, timeout=1.0):
+        if host == "gw":
+            return _mk_resp(1, 50.0)
+        return _mk_resp(1, 0.0)
+    monkeypatch.setattr(mode_wifi_diag.ping_check, "run_ping", fake_ping)
+    monkeypatch.setattr(mode_wifi_diag, "append_rows", lambda path, rows: None)
+    diag = mode_wifi_diag.run_wifi_diag(rounds=3, interval=0, gateway_host="gw", external_host="ex", log_path=":memory:")
+    assert "Wi-Fi congestion" in diag